@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Configuration of the access of the managers.
+
+Extends :mod:`my_site.records.config`, whose endpoints it replaces. Load it
+from the instance configuration (``invenio.cfg``)::
+
+    from my_site.records.config_managers import *  # noqa
+"""
+
+from __future__ import absolute_import, print_function
+
+from my_site.records.config import RECORDS_REST_DEFAULT_SORT, \
+    RECORDS_REST_FACETS, RECORDS_REST_SORT_OPTIONS
+from my_site.records.config import \
+    RECORDS_REST_ENDPOINTS as _RECORDS_REST_ENDPOINTS
+from my_site.records.config import \
+    RECORDS_UI_ENDPOINTS as _RECORDS_UI_ENDPOINTS
+from my_site.records.managers import OwnerManagerRecordsSearch, \
+    owner_manager_permission_factory
+
+__all__ = (
+    'MY_SITE_ENDPOINTS_ENABLED',
+    'MY_SITE_RECORDS_ROLE_FILTERS',
+    'RECORDS_REST_DEFAULT_SORT',
+    'RECORDS_REST_ENDPOINTS',
+    'RECORDS_REST_FACETS',
+    'RECORDS_REST_SORT_OPTIONS',
+    'RECORDS_UI_ENDPOINTS',
+)
+
+MY_SITE_ENDPOINTS_ENABLED = False
+"""The endpoints below are used instead of the ones of the package."""
+
+RECORDS_REST_ENDPOINTS = dict(
+    _RECORDS_REST_ENDPOINTS,
+    recid=dict(
+        _RECORDS_REST_ENDPOINTS['recid'],
+        search_class=OwnerManagerRecordsSearch,
+        read_permission_factory_imp=owner_manager_permission_factory,
+        update_permission_factory_imp=owner_manager_permission_factory,
+        delete_permission_factory_imp=owner_manager_permission_factory,
+    ),
+)
+"""REST API for my-site, open to the managers."""
+
+RECORDS_UI_ENDPOINTS = dict(
+    _RECORDS_UI_ENDPOINTS,
+    recid=dict(
+        _RECORDS_UI_ENDPOINTS['recid'],
+        permission_factory_imp='my_site.records.managers:'
+                               'owner_manager_permission_factory',
+    ),
+)
+"""Records UI for my-site, open to the managers."""
+
+MY_SITE_RECORDS_ROLE_FILTERS = {
+    'managers': '*',
+}
+"""Records searchable by the users having a role, besides their own ones:
+``'*'`` for all the records, or a ``(field, value)`` tuple for the records
+having that value, e.g. ``('group', 'physics')``."""
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Access of the managers to the records of other users.
+
+Extends :mod:`my_site.records.permissions` with the permission factory and
+the search class of the managers, enabled by
+:mod:`my_site.records.config_managers`.
+"""
+
+from __future__ import absolute_import, print_function
+
+from elasticsearch_dsl import Q
+from flask import current_app, g
+from flask_principal import RoleNeed, UserNeed
+from flask_security import current_user
+from invenio_search.api import DefaultFilter, RecordsSearch
+
+from .permissions import CachedPermission
+from .proxies import current_my_site
+
+MATCH_ALL = Q('match_all')
+"""Filter of the users allowed to see all the records."""
+
+MATCH_NONE = Q('match_none')
+"""Filter of the anonymous users."""
+
+
+def owner_manager_permission_factory(record=None):
+    """Returns permission for managers group."""
+    return CachedPermission(UserNeed(record["owner"]), RoleNeed('managers'))
+
+
+def compile_role_filter(roles, role_filters):
+    """Compile the filter clauses granted by a set of roles.
+
+    :param roles: The names of the roles of the user.
+    :param role_filters: Mapping of role names to ``'*'``, granting access to
+        all the records, or to a ``(field, value)`` tuple, granting access to
+        the records with that value.
+    :returns: ``MATCH_ALL``, or a tuple of clauses. The values granted on a
+        same field are merged in a single ``terms`` clause, so that the size
+        of the query does not grow with the number of roles.
+    """
+    values = {}
+    for role in roles:
+        granted = role_filters.get(role)
+        if granted == '*':
+            return MATCH_ALL
+        if granted:
+            field, value = granted
+            values.setdefault(field, set()).add(value)
+    return tuple(
+        Q('terms', **{field: sorted(values[field])})
+        for field in sorted(values)
+    )
+
+
+def role_filter(roles):
+    """Return the compiled filter of a set of roles, from the cache."""
+    roles = frozenset(roles)
+    cache = current_my_site.role_filters
+    compiled = cache.get(roles)
+    if compiled is None:
+        compiled = compile_role_filter(roles, current_app.config.get(
+            'MY_SITE_RECORDS_ROLE_FILTERS', {'managers': '*'}))
+        cache.set(roles, compiled)
+    return compiled
+
+
+def owner_manager_permission_filter():
+    """Search filter with permission."""
+    if not current_user.is_authenticated:
+        return [MATCH_NONE]
+    # the roles were loaded with the identity, no need to query them again
+    roles = (need.value for need in g.identity.provides
+             if need.method == 'role')
+    compiled = role_filter(roles)
+    if compiled is MATCH_ALL:
+        return [MATCH_ALL]
+    owner = Q('term', owner=int(current_user.get_id()))
+    if not compiled:
+        return [owner]
+    return [Q('bool', should=(owner, ) + compiled, minimum_should_match=1)]
+
+
+class OwnerManagerRecordsSearch(RecordsSearch):
+    """Class providing permission search filter."""
+
+    class Meta:
+        index = 'records'
+        default_filter = DefaultFilter(owner_manager_permission_filter)
+        doc_types = None
@@ -15,13 +15,17 @@ from flask import current_app
 from invenio_jsonschemas import current_jsonschemas
 from invenio_records.api import Record
 
+from ..records.validators import CachedValidationMixin
 
 
-class AuthorRecord(Record):
+class AuthorRecord(CachedValidationMixin, Record):
     """Author record class."""
 
+    _schema = 'authors/author-v1.0.0.json'
+    """Path of the schema of the authors."""
+
     @classmethod
     def create(cls, data, id_=None, **kwargs):
         """Create Author record."""
-        data["$schema"] = current_jsonschemas.path_to_url('authors/author-v1.0.0.json')
+        data["$schema"] = current_jsonschemas.path_to_url(cls._schema)
         return super(AuthorRecord, cls).create(data, id_=id_, **kwargs)
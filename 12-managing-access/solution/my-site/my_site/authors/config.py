@@ -9,12 +9,14 @@
 
 from __future__ import absolute_import, print_function
 
-from invenio_indexer.api import RecordIndexer
 from invenio_records_rest.facets import terms_filter
-from invenio_records_rest.utils import allow_all, check_elasticsearch
+from invenio_records_rest.utils import allow_all
 from invenio_search import RecordsSearch
 
+from my_site.records.indexer import MySiteRecordIndexer
+
 from .api import AuthorRecord
+from .permissions import indexed_author_permission
 
 def _(x):
     """Identity function for string extraction."""
@@ -28,28 +30,31 @@ RECORDS_REST_ENDPOINTS = {
         default_endpoint_prefix=True,
         record_class=AuthorRecord,
         search_class=RecordsSearch,
-        indexer_class=RecordIndexer,
+        indexer_class=MySiteRecordIndexer,
         search_index='authors',
         search_type=None,
+        search_factory_imp='my_site.records.query'
+                           ':conditional_search_factory',
         record_serializers={
             'application/json': ('my_site.authors.serializers'
                                  ':json_v1_response'),
         },
         search_serializers={
             'application/json': ('my_site.authors.serializers'
-                                 ':json_v1_search'),
+                                 ':json_v1_search_stream'),
         },
         record_loaders={
             'application/json': ('my_site.authors.loaders'
                                  ':json_v1'),
         },
         list_route='/authors/',
-        item_route='/authors/<pid(authid):pid_value>',
+        item_route='/authors/<cached_pid(authid,record_class='
+                   '"my_site.authors.api:AuthorRecord"):pid_value>',
         default_media_type='application/json',
         max_result_window=10000,
         error_handlers=dict(),
         create_permission_factory_imp=allow_all,
-        read_permission_factory_imp=check_elasticsearch,
+        read_permission_factory_imp=indexed_author_permission,
         update_permission_factory_imp=allow_all,
         delete_permission_factory_imp=allow_all,
         list_permission_factory_imp=allow_all
@@ -84,3 +89,18 @@ RECORDS_REST_DEFAULT_SORT = dict(
     )
 )
 """Set default sorting options."""
+
+AUTHORS_EXISTENCE_REBUILD_INTERVAL = 600
+"""Seconds between loads of the Bloom filter of the indexed authors, which
+should match the schedule of the ``rebuild_indexed_authors`` task."""
+
+AUTHORS_EXISTENCE_ERROR_RATE = 0.001
+"""False positive rate of the Bloom filter of the indexed authors."""
+
+AUTHORS_EXISTENCE_CACHE_SIZE = 10000
+"""Number of authors indexed, deleted or looked up since the last rebuild
+which are cached."""
+
+AUTHORS_EXISTENCE_NEGATIVE_TTL = 5
+"""Seconds an author missing from the index, or deleted, is cached before
+being looked up again."""
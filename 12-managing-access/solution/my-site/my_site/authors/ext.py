@@ -9,7 +9,12 @@
 
 from __future__ import absolute_import, print_function
 
+from invenio_records.signals import after_record_delete
+
+from ..records.signals import record_indexed
 from . import config
+from .permissions import IndexedAuthors, author_deleted_receiver, \
+    author_indexed_receiver
 
 
 class Authors(object):
@@ -23,7 +28,18 @@ class Authors(object):
     def init_app(self, app):
         """Flask application initialization."""
         self.init_config(app)
+        self.indexed_authors = IndexedAuthors(
+            index=app.config['RECORDS_REST_ENDPOINTS']['authid'][
+                'search_index'],
+            interval=app.config['AUTHORS_EXISTENCE_REBUILD_INTERVAL'],
+            error_rate=app.config['AUTHORS_EXISTENCE_ERROR_RATE'],
+            cache_size=app.config['AUTHORS_EXISTENCE_CACHE_SIZE'],
+            negative_ttl=app.config['AUTHORS_EXISTENCE_NEGATIVE_TTL'])
         app.extensions['my-site-authors'] = self
+        record_indexed.connect(
+            author_indexed_receiver, sender=app, weak=False)
+        after_record_delete.connect(
+            author_deleted_receiver, sender=app, weak=False)
 
     def init_config(self, app):
         """Initialize configuration.
@@ -16,13 +16,13 @@ PersistentIdentifier field.
 
 from __future__ import absolute_import, print_function
 
-from invenio_records_rest.loaders.marshmallow import json_patch_loader, \
-    marshmallow_loader
+from invenio_records_rest.loaders.marshmallow import json_patch_loader
 
+from ...records.loaders import validated_loader
 from ..marshmallow import AuthorMetadataSchemaV1
 
 #: JSON loader using Marshmallow for data validation.
-json_v1 = marshmallow_loader(AuthorMetadataSchemaV1)
+json_v1 = validated_loader(AuthorMetadataSchemaV1, ('name', 'organization'))
 
 __all__ = (
     'json_v1',
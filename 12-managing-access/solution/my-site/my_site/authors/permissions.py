@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Permissions of the authors, checking their existence in the index."""
+
+from __future__ import absolute_import, print_function
+
+import hashlib
+import math
+import time
+
+from elasticsearch.helpers import scan
+from flask import current_app
+from invenio_cache import current_cache
+from invenio_search import RecordsSearch, current_search_client
+from invenio_search.utils import build_alias_name
+
+from my_site.records.cache import LRUCache
+from my_site.records.jsonresolvers import is_author
+
+FILTER_KEY = 'my_site:indexed_authors'
+"""Cache key of the shared Bloom filter of the indexed authors."""
+
+RETRY_INTERVAL = 60
+"""Seconds between loads of the shared filter while it is not built."""
+
+
+class BloomFilter(object):
+    """Set membership with false positives, in constant memory.
+
+    :param capacity: Expected number of keys.
+    :param error_rate: Wanted false positive rate at that capacity.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """Initialize the filter."""
+        capacity = max(capacity, 1)
+        self.size = int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(
+            int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        """Bit positions of a key, by double hashing."""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        """Add a key."""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        """Check if a key was probably added."""
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class IndexedAuthors(object):
+    """Local view of the authors present in the search index.
+
+    The UUIDs of the indexed authors are loaded in a Bloom filter by the
+    ``rebuild_indexed_authors`` task, and shared through the cache. Each
+    process loads it at most every ``interval`` seconds, never scanning the
+    index itself. Authors indexed in this process since then are recorded in
+    a TTL cache, which takes precedence. Authors missing from both, e.g.
+    indexed by another process, and all of them until the filter is built,
+    are looked up in the index and the answer is cached.
+
+    Negative answers, including the authors deleted in this process, are
+    only cached for ``negative_ttl`` seconds: an author indexed by another
+    process is then found on the next lookup, and a deleted one still
+    matching the filter is looked up again.
+    """
+
+    def __init__(self, index, interval=600, error_rate=0.001,
+                 cache_size=10000, negative_ttl=5):
+        """Initialize the view.
+
+        :param index: The index of the authors.
+        :param interval: Seconds between rebuilds of the Bloom filter.
+        :param error_rate: False positive rate of the Bloom filter.
+        :param cache_size: Number of authors cached since the last rebuild.
+        :param negative_ttl: Seconds a missing author is cached.
+        """
+        self.index = index
+        self.interval = interval
+        self.error_rate = error_rate
+        self.cache = LRUCache(maxsize=cache_size, ttl=interval)
+        self.missing = LRUCache(maxsize=cache_size, ttl=negative_ttl)
+        self.bloom = None
+        self.checked = 0
+
+    def rebuild(self):
+        """Load the UUIDs of all the indexed authors in the shared filter.
+
+        It is kept for two intervals, so that lookups fall back to the index
+        if it is not rebuilt anymore.
+        """
+        client = current_search_client
+        index = build_alias_name(self.index)
+        count = client.count(index=index)['count']
+        bloom = BloomFilter(
+            int(count * 1.1) + 1000, error_rate=self.error_rate)
+        for hit in scan(client, index=index,
+                        query={'_source': False}, size=5000):
+            bloom.add(hit['_id'])
+        current_cache.set(FILTER_KEY, bloom, timeout=2 * self.interval)
+        self.bloom, self.checked = bloom, time.time()
+
+    def _refresh(self):
+        """Load the shared filter if outdated."""
+        interval = self.interval if self.bloom is not None else \
+            min(self.interval, RETRY_INTERVAL)
+        if time.time() - self.checked < interval:
+            return
+        self.checked = time.time()
+        bloom = current_cache.get(FILTER_KEY)
+        if bloom is None and self.bloom is None:
+            from .tasks import rebuild_indexed_authors
+            rebuild_indexed_authors.delay()
+        self.bloom = bloom
+
+    def exists(self, record_id):
+        """Check if an author is indexed."""
+        record_id = str(record_id)
+        if record_id in self.missing:
+            return False
+        if record_id in self.cache:
+            return True
+        self._refresh()
+        if self.bloom is not None and record_id in self.bloom:
+            return True
+        exists = RecordsSearch(index=self.index).get_record(
+            record_id).count() == 1
+        (self.cache if exists else self.missing).set(record_id, True)
+        return exists
+
+    def indexed(self, record_id):
+        """Record that an author was indexed."""
+        self.missing.delete(str(record_id))
+        self.cache.set(str(record_id), True)
+
+    def deleted(self, record_id):
+        """Record that an author was removed from the index."""
+        self.cache.delete(str(record_id))
+        self.missing.set(str(record_id), True)
+
+
+def author_indexed_receiver(sender, record_id=None, json=None, **kwargs):
+    """Add an indexed author to the local view.
+
+    Connected to :data:`my_site.records.signals.record_indexed`.
+    """
+    if json is not None and is_author(json):
+        current_app.extensions['my-site-authors'].indexed_authors.indexed(
+            record_id)
+
+
+def author_deleted_receiver(sender, record=None, **kwargs):
+    """Remove a deleted author from the local view."""
+    if record is not None and is_author(record):
+        current_app.extensions['my-site-authors'].indexed_authors.deleted(
+            record.id)
+
+
+def indexed_author_permission(record, *args, **kwargs):
+    """Return permission that checks if the author is in the index.
+
+    Alternative to :func:`~invenio_records_rest.utils.check_elasticsearch`
+    answering from :class:`IndexedAuthors`, without a search in the common
+    case.
+
+    :params record: A record object.
+    :returns: A object instance with a ``can()`` method.
+    """
+    def can(self):
+        """Look up the author in the local view of the index."""
+        return current_app.extensions['my-site-authors'] \
+            .indexed_authors.exists(record.id)
+
+    return type('IndexedAuthor', (), {'can': can})()
@@ -9,10 +9,11 @@
 """Circulation PID providers."""
 
 from invenio_pidstore.models import PIDStatus
-from invenio_pidstore.providers.recordid import RecordIdProvider
 
+from ..records.providers import BlockRecordIdProvider
 
-class AuthorIdProvider(RecordIdProvider):
+
+class AuthorIdProvider(BlockRecordIdProvider):
     """Author identifier provider."""
 
     pid_type = 'authid'
@@ -9,11 +9,12 @@
 
 from __future__ import absolute_import, print_function
 
-from invenio_records_rest.serializers.json import JSONSerializer
-from invenio_records_rest.serializers.response import record_responsify, \
-    search_responsify
+from invenio_records_rest.serializers.response import search_responsify
 
+from ...records.serializers.response import cached_record_responsify
 from ..marshmallow import AuthorSchemaV1
+from .json import JSONSerializer
+from .response import search_streamify
 
 # Serializers
 # ===========
@@ -23,12 +24,15 @@ json_v1 = JSONSerializer(AuthorSchemaV1, replace_refs=True)
 # Records-REST serializers
 # ========================
 #: JSON record serializer for individual records.
-json_v1_response = record_responsify(json_v1, 'application/json')
+json_v1_response = cached_record_responsify(json_v1, 'application/json')
 #: JSON record serializer for search results.
 json_v1_search = search_responsify(json_v1, 'application/json')
+#: JSON record serializer for search results, streaming the hits.
+json_v1_search_stream = search_streamify(json_v1, 'application/json')
 
 __all__ = (
     'json_v1',
     'json_v1_response',
     'json_v1_search',
+    'json_v1_search_stream',
 )
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""JSON serializer streaming the search results."""
+
+from __future__ import absolute_import, print_function
+
+from flask import json
+
+from ...records.serializers.json import JSONSerializer as _JSONSerializer
+
+
+class JSONSerializer(_JSONSerializer):
+    """Compiled JSON serializer, able to stream search results."""
+
+    def serialize_search_stream(self, pid_fetcher, search_result, links=None,
+                                item_links_factory=None, **kwargs):
+        """Serialize a search result, one hit at a time.
+
+        The output is the same as :meth:`serialize_search`, but it is
+        generated incrementally: the serialized hits are never held in
+        memory together, and each hit is released from the search result
+        once serialized.
+
+        :param pid_fetcher: Persistent identifier fetcher.
+        :param search_result: Elasticsearch search result.
+        :param links: Dictionary of links to add to response.
+        :returns: A generator of JSON chunks.
+        """
+        format_args = self._format_args()
+        if format_args['indent']:
+            # pretty printing is only meant for humans, and small pages
+            yield self.serialize_search(
+                pid_fetcher, search_result, links=links,
+                item_links_factory=item_links_factory, **kwargs)
+            return
+
+        total = search_result['hits']['total']
+        if isinstance(total, dict):
+            total = total['value']
+        # keys are emitted in the sorted order used by json.dumps
+        yield '{{"aggregations":{0},"hits":{{"hits":['.format(json.dumps(
+            search_result.get('aggregations', dict()), **format_args))
+
+        hits = search_result['hits']['hits']
+        hits.reverse()
+        separator = ''
+        while hits:
+            hit = hits.pop()
+            yield separator + json.dumps(self.transform_search_hit(
+                pid_fetcher(hit['_id'], hit['_source']),
+                hit,
+                links_factory=item_links_factory,
+                **kwargs
+            ), **format_args)
+            separator = ','
+
+        yield '],"total":{0}}},"links":{1}}}'.format(
+            json.dumps(total), json.dumps(links or {}, **format_args))
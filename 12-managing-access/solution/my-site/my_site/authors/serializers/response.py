@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Streamed response factories."""
+
+from __future__ import absolute_import, print_function
+
+from flask import current_app, g, stream_with_context
+from invenio_records_rest.serializers.response import add_link_header
+
+from ...records.query import cursor_links
+
+
+def search_streamify(serializer, mimetype):
+    """Create a Records-REST search result response streaming its body.
+
+    The validator of the search, if any, is sent as entity tag; streamed
+    bodies are not cached.
+
+    :param serializer: Serializer instance, providing a
+        ``serialize_search_stream`` method.
+    :param mimetype: MIME type of response.
+    :returns: Function that generates a streamed HTTP response.
+    """
+    def view(pid_fetcher, search_result, code=200, headers=None, links=None,
+             item_links_factory=None):
+        links = cursor_links(links, search_result)
+        response = current_app.response_class(
+            stream_with_context(serializer.serialize_search_stream(
+                pid_fetcher, search_result, links=links,
+                item_links_factory=item_links_factory)),
+            mimetype=mimetype)
+        response.status_code = code
+        etag, last_modified = getattr(
+            g, 'my_site_search_validator', (None, None))
+        if etag:
+            response.set_etag(etag)
+            response.last_modified = last_modified
+        if headers is not None:
+            response.headers.extend(headers)
+
+        if links is not None:
+            add_link_header(response, links)
+
+        return response
+
+    view.serializer = serializer
+    return view
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Celery tasks."""
+
+from __future__ import absolute_import, print_function
+
+from celery import shared_task
+from flask import current_app
+
+
+@shared_task(ignore_result=True)
+def rebuild_indexed_authors():
+    """Rebuild the shared Bloom filter of the indexed authors."""
+    current_app.extensions['my-site-authors'].indexed_authors.rebuild()
@@ -95,6 +95,13 @@ ACCOUNTS_SESSION_REDIS_URL = 'redis://localhost:6379/1'
 #: client. Set to False, in case of doubt.
 ACCOUNTS_USERINFO_HEADERS = True
 
+# Cache
+# =====
+#: Cache type, shared between the web and worker processes.
+CACHE_TYPE = 'redis'
+#: Redis cache storage URL.
+CACHE_REDIS_URL = 'redis://localhost:6379/0'
+
 # Celery configuration
 # ====================
 
@@ -106,9 +113,13 @@ CELERY_RESULT_BACKEND = 'redis://localhost:6379/2'
 #: Scheduled tasks configuration (aka cronjobs).
 CELERY_BEAT_SCHEDULE = {
     'indexer': {
-        'task': 'invenio_indexer.tasks.process_bulk_queue',
+        'task': 'my_site.records.tasks.process_bulk_queue',
         'schedule': timedelta(minutes=5),
     },
+    'indexed-authors': {
+        'task': 'my_site.authors.tasks.rebuild_indexed_authors',
+        'schedule': timedelta(minutes=10),
+    },
     'accounts': {
         'task': 'invenio_accounts.tasks.clean_session_table',
         'schedule': timedelta(minutes=60),
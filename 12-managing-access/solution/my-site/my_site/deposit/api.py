@@ -3,26 +3,133 @@
 from __future__ import absolute_import, print_function
 
 import uuid
+from itertools import islice
 
 from flask import current_app
 from invenio_db import db
-from invenio_indexer.api import RecordIndexer
+from invenio_jsonschemas import current_jsonschemas
 from invenio_pidstore import current_pidstore
-from invenio_records.api import Record
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_records.models import RecordMetadata
+from invenio_records.signals import after_record_insert, \
+    before_record_insert
+from jsonschema.exceptions import ValidationError
+
+from ..records.api import Record
+from ..records.indexer import MySiteRecordIndexer
+from ..records.proxies import current_my_site
+from ..records.validators import ValidatedData
 
 
 def create_record(data):
     """Create a record.
 
+    The record is indexed according to ``MY_SITE_DEPOSIT_INDEXING``:
+
+    * ``sync``: within the database transaction.
+    * ``after_commit``: right after the transaction is committed.
+    * ``queue``: sent to the bulk indexing queue after the commit.
+
     :param dict data: The record data.
+    :returns: The created record.
     """
+    mode = current_app.config['MY_SITE_DEPOSIT_INDEXING']
+    indexer = MySiteRecordIndexer()
     with db.session.begin_nested():
         # create uuid
         rec_uuid = uuid.uuid4()
         # create PID
-        current_pidstore.minters['recid'](rec_uuid, data)
+        current_pidstore.minters['my_site_recid'](rec_uuid, data)
         # create record
         created_record = Record.create(data, id_=rec_uuid)
         # index the record
-        RecordIndexer().index(created_record)
+        if mode == 'sync':
+            indexer.index(created_record)
     db.session.commit()
+    if mode == 'after_commit':
+        indexer.index(created_record)
+    elif mode == 'queue':
+        indexer.bulk_index([str(created_record.id)])
+    return created_record
+
+
+def create_records(iterable, batch_size=500, record_class=Record,
+                   pid_type='recid'):
+    """Create records in batches.
+
+    Each batch is created in a single transaction: its PIDs are taken from
+    the block of identifiers reserved by the process, the records are
+    validated and inserted together, and the transaction is committed before
+    the records are sent to the bulk indexing queue.
+
+    :param iterable: Iterable of record data.
+    :param batch_size: Number of records per transaction.
+    :param record_class: The record API class. The URL of the schema it
+        defines in ``_schema``, if any, is set in the records.
+    :param pid_type: The type of the PIDs of the records.
+    :returns: A generator of ``(record, None)`` tuples for the created
+        records, and ``(data, error)`` tuples for the invalid ones.
+    """
+    pid_field = current_app.config['PIDSTORE_RECID_FIELD']
+    indexer = MySiteRecordIndexer()
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        results = _create_batch(batch, pid_field, record_class, pid_type)
+        db.session.commit()
+        indexer.bulk_index(
+            str(record.id) for record, error in results if error is None)
+        for result in results:
+            yield result
+
+
+def _create_batch(batch, pid_field, record_class, pid_type):
+    """Create a batch of records, without committing them."""
+    app = current_app._get_current_object()
+    schema = getattr(record_class, '_schema', None)
+    if schema:
+        schema = current_jsonschemas.path_to_url(schema)
+    results, pids, models = [], [], []
+    for data, recid in zip(
+            batch, current_my_site.pid_allocator.take(len(batch))):
+        if pid_field in data:
+            results.append((data, ValueError(
+                'The record already has a {0}.'.format(pid_field))))
+            continue
+        rec_uuid = uuid.uuid4()
+        data[pid_field] = str(recid)
+        if schema:
+            data['$schema'] = schema
+        record = record_class(data)
+        try:
+            before_record_insert.send(app, record=record)
+            if isinstance(data, ValidatedData):
+                record.validate(validated_fields=data.validated_fields)
+            else:
+                record.validate()
+        except ValidationError as e:
+            del data[pid_field]
+            if schema:
+                del data['$schema']
+            results.append((data, e))
+            continue
+        record.model = RecordMetadata(id=rec_uuid, json=record)
+        pids.append(PersistentIdentifier(
+            pid_type=pid_type,
+            pid_value=str(recid),
+            object_type='rec',
+            object_uuid=rec_uuid,
+            status=PIDStatus.REGISTERED,
+        ))
+        models.append(record.model)
+        results.append((record, None))
+
+    db.session.add_all(models)
+    db.session.add_all(pids)
+    db.session.flush()
+    for record, error in results:
+        if error is None:
+            after_record_insert.send(app, record=record)
+    return results
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Command line interface for the deposit of records."""
+
+from __future__ import absolute_import, print_function
+
+import json
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from .api import create_records
+
+
+@click.group()
+def deposit():
+    """Deposit commands."""
+
+
+def _read_lines(fp):
+    """Iterate the records of a file with one JSON document per line."""
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+@deposit.command('import')
+@click.argument('source', type=click.File('r'), default='-')
+@click.option('-b', '--batch-size', type=int, default=500,
+              show_default=True, help='Number of records per transaction.')
+@with_appcontext
+def import_records(source, batch_size):
+    """Create the records of a file with one JSON document per line."""
+    started = time.time()
+    created = failed = 0
+    for line, (data, error) in enumerate(
+            create_records(_read_lines(source), batch_size=batch_size), 1):
+        if error is None:
+            created += 1
+        else:
+            failed += 1
+            click.secho('Line {0}: {1}'.format(line, error), fg='red',
+                        err=True)
+    elapsed = time.time() - started
+    click.secho(
+        'Created {0} records in {1:.1f}s ({2:.0f}/s), {3} failed.'.format(
+            created, elapsed, created / elapsed if elapsed else 0, failed),
+        fg='green')
@@ -2,7 +2,10 @@
 
 from __future__ import absolute_import, print_function
 
-from flask import Blueprint, redirect, render_template, url_for
+import time
+
+from flask import Blueprint, current_app, redirect, render_template, \
+    session, url_for
 from flask_login import login_required
 from flask_security import current_user
 
@@ -31,13 +34,16 @@ def create():
         # set the owner as the current logged in user
         owner = int(current_user.get_id())
         # create the record
-        create_record(
+        record = create_record(
           dict(
             title=form.title.data,
             contributors=contributors,
             owner=owner,
           )
         )
+        # remember it until it is searchable
+        if current_app.config['MY_SITE_DEPOSIT_INDEXING'] != 'sync':
+            add_pending(record)
         # redirect to the success page
         return redirect(url_for('deposit.success'))
     return render_template('deposit/create.html', form=form)
@@ -47,4 +53,21 @@ def create():
 @login_required
 def success():
     """The success view."""
-    return render_template('deposit/success.html')
+    return render_template('deposit/success.html', pending=pending_records())
+
+
+def add_pending(record):
+    """Add a record to the records of the user being indexed."""
+    expires = time.time() + current_app.config['MY_SITE_DEPOSIT_PENDING_TTL']
+    session['my_site_pending'] = pending_records() + [
+        dict(id=record['id'], title=record.get('title'), expires=expires)
+    ]
+
+
+def pending_records():
+    """Records of the user which may not be searchable yet."""
+    now = time.time()
+    return [
+        pending for pending in session.get('my_site_pending', [])
+        if pending['expires'] > now
+    ]
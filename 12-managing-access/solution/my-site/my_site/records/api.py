@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Record API."""
+
+from __future__ import absolute_import, print_function
+
+from invenio_jsonschemas import current_jsonschemas
+from invenio_records.api import Record as _Record
+
+from .validators import CachedValidationMixin
+
+
+class Record(CachedValidationMixin, _Record):
+    """Record validated with the cached validators."""
+
+    _schema = 'records/record-v1.0.0.json'
+    """Path of the schema of the records."""
+
+    @classmethod
+    def create(cls, data, id_=None, **kwargs):
+        """Create a record, validated against the schema of the records."""
+        data['$schema'] = current_jsonschemas.path_to_url(cls._schema)
+        return super(Record, cls).create(data, id_=id_, **kwargs)
+
+    def commit(self, **kwargs):
+        """Store the changes, keeping the schema of a replaced record."""
+        self.setdefault(
+            '$schema', current_jsonschemas.path_to_url(self._schema))
+        return super(Record, self).commit(**kwargs)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""In-process caches."""
+
+from __future__ import absolute_import, print_function
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Bounded, thread-safe least-recently-used cache.
+
+    :param maxsize: Maximum number of entries, ``0`` disables the cache.
+    :param ttl: Optional time to live of an entry, in seconds.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` or ``default``."""
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the oldest entries."""
+        if self.maxsize <= 0:
+            return
+        expires = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove ``key`` from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key):
+        """Check if ``key`` is cached, without touching the counters."""
+        with self._lock:
+            entry = self._data.get(key)
+        return entry is not None and (
+            entry[0] is None or entry[0] >= time.time())
+
+    def __len__(self):
+        """Return the number of cached entries."""
+        return len(self._data)
+
+    @property
+    def stats(self):
+        """Hit/miss counters of the cache."""
+        return dict(hits=self.hits, misses=self.misses, size=len(self))
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Command line interface for My site records.
+
+The indexing commands are attached to the ``index`` group of
+Invenio-Indexer, which is re-exported here so that the ``flask.commands``
+entry point makes them available as ``my-site index <command>``.
+"""
+
+from __future__ import absolute_import, print_function
+
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from invenio_app.factory import create_app
+from invenio_db import db
+from invenio_indexer.cli import index
+from invenio_records.models import RecordMetadata
+from invenio_search import RecordsSearch
+
+from . import reindex
+from .export import export_records, export_search, export_serializer
+from .indexer import author_refs
+from .jsonresolvers import is_author
+from .models import AuthorReference
+from .tasks import reindex_range as reindex_range_task
+
+_app = None
+"""Application of a local worker process, see :func:`_init_worker`."""
+
+
+def abort_if_false(ctx, param, value):
+    """Abort command if value is False."""
+    if not value:
+        ctx.abort()
+
+
+def _init_worker(app_factory):
+    """Create the application of a local worker process.
+
+    Each worker creates its own, so that the pool works with any start
+    method (``fork``, ``spawn`` or ``forkserver``).
+    """
+    global _app
+    _app = app_factory()
+
+
+def _reindex_range_worker(pid_type, start, end, index=None):
+    """Reindex a range of PIDs in a local worker process."""
+    with _app.app_context():
+        try:
+            return reindex.reindex_range(pid_type, start, end, index=index)
+        finally:
+            db.session.remove()
+
+
+def _report(pid_type, pid_range, count, elapsed):
+    """Print the throughput of a completed range."""
+    click.echo('{0} [{1}-{2}]: {3} records in {4:.1f}s ({5:.0f}/s)'.format(
+        pid_type, pid_range[0], pid_range[1], count, elapsed,
+        count / elapsed if elapsed else 0))
+
+
+def _run_local(ranges, workers, state, index=None, progress=None,
+               app_factory=create_app):
+    """Reindex the ranges with a pool of local processes.
+
+    :param app_factory: Factory of the application of each worker.
+    """
+    # connections must not be shared with forked workers
+    db.session.remove()
+    db.engine.dispose()
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(app_factory, )) as pool:
+        futures = {
+            pool.submit(_reindex_range_worker, pid_type, *pid_range,
+                        index=index):
+                (pid_type, pid_range)
+            for pid_type, pid_range in ranges
+        }
+        for future in as_completed(futures):
+            pid_type, pid_range = futures[future]
+            count, elapsed = future.result()
+            _report(pid_type, pid_range, count, elapsed)
+            state.done(pid_type, pid_range)
+            total += count
+            if progress:
+                progress()
+    return total
+
+
+def _run_celery(ranges, state, index=None, progress=None):
+    """Reindex the ranges with Celery tasks, waiting for their results."""
+    pending = {
+        reindex_range_task.delay(pid_type, *pid_range, index=index):
+            (pid_type, pid_range)
+        for pid_type, pid_range in ranges
+    }
+    total = 0
+    while pending:
+        for result in [r for r in pending if r.ready()]:
+            pid_type, pid_range = pending.pop(result)
+            count, elapsed = result.get()
+            _report(pid_type, pid_range, count, elapsed)
+            state.done(pid_type, pid_range)
+            total += count
+            if progress:
+                progress()
+        if pending:
+            time.sleep(1)
+    return total
+
+
+@index.command('reindex-parallel')
+@click.option('--yes-i-know', is_flag=True, callback=abort_if_false,
+              expose_value=False,
+              prompt='Do you really want to reindex all records?')
+@click.option('-t', '--pid-type', 'pid_types', multiple=True,
+              type=click.Choice(['recid', 'authid']),
+              default=('recid', 'authid'), show_default=True)
+@click.option('-w', '--workers', type=int, default=os.cpu_count(),
+              show_default=True, help='Number of local worker processes.')
+@click.option('--range-size', type=int, default=10000, show_default=True,
+              help='Number of PID primary keys per partition.')
+@click.option('--celery', 'use_celery', is_flag=True, default=False,
+              help='Fan out the partitions to Celery tasks.')
+@click.option('--state-file', type=click.Path(dir_okay=False),
+              default=None,
+              help='File tracking the completed partitions, used to resume '
+                   'an interrupted reindex. Defaults to the instance path.')
+@click.option('--restart', is_flag=True, default=False,
+              help='Ignore the partitions completed by a previous run.')
+@click.option('--blue-green', is_flag=True, default=False,
+              help='Build a new index in the background and swap the alias '
+                   'once it caught up, without taking search offline.')
+@click.option('--max-wait', type=int, default=300, show_default=True,
+              help='Seconds to wait for the new index to catch up before '
+                   'giving up on the alias swap (with --blue-green).')
+@with_appcontext
+def reindex_parallel(pid_types, workers, range_size, use_celery,
+                     state_file, restart, blue_green, max_wait):
+    """Reindex records directly, partitioning the PIDs in ranges.
+
+    Each partition is streamed from the database and bulk indexed by a local
+    worker process (or a Celery task with ``--celery``). Completed partitions
+    are recorded so that a crashed run resumes where it stopped.
+
+    With ``--blue-green``, records are indexed into a new versioned index
+    while writes keep going to both indices; the aliases are then swapped.
+    """
+    if blue_green and len(pid_types) != 1:
+        raise click.UsageError('--blue-green requires a single --pid-type.')
+
+    state_file = state_file or os.path.join(
+        current_app.instance_path, 'reindex-parallel.json')
+    state = reindex.ReindexState(state_file, range_size)
+    if restart:
+        state.clear()
+
+    target, progress = None, None
+    if blue_green:
+        target = reindex.BlueGreenIndex.for_pid_type(
+            pid_types[0], new_index=state.index)
+        if target.new_index != state.index:
+            state.clear()
+            state.index = target.new_index
+            state.save()
+        click.secho('Building {0}, dual-writing from {1}...'.format(
+            target.new_index, target.write_alias), fg='green')
+        target.start_dualwrite()
+
+        def progress():
+            click.echo('Catch-up lag: {0} documents.'.format(target.lag()))
+    elif state.index:
+        # the previous run was indexing into another index
+        state.clear()
+
+    ranges = []
+    for pid_type in pid_types:
+        for pid_range in reindex.pid_ranges(pid_type, range_size):
+            if not state.is_done(pid_type, pid_range):
+                ranges.append((pid_type, pid_range))
+    click.secho('Reindexing {0} partitions...'.format(len(ranges)),
+                fg='green')
+
+    started = time.time()
+    index = target.new_index if target else None
+    if use_celery:
+        total = _run_celery(ranges, state, index=index, progress=progress)
+    else:
+        total = _run_local(
+            ranges, workers, state, index=index, progress=progress)
+    elapsed = time.time() - started
+
+    if target:
+        deadline = time.time() + max_wait
+        lag = target.lag()
+        while lag > 0 and time.time() < deadline:
+            click.echo('Catch-up lag: {0} documents.'.format(lag))
+            time.sleep(5)
+            lag = target.lag()
+        if lag > 0:
+            raise click.ClickException(
+                '{0} did not catch up, run the command again to resume '
+                'it.'.format(target.new_index))
+        old_indices = target.swap()
+        click.secho('Aliases moved to {0}, {1} can be deleted.'.format(
+            target.new_index, ', '.join(old_indices)), fg='green')
+
+    state.clear()
+    click.secho('Indexed {0} records in {1:.1f}s ({2:.0f}/s).'.format(
+        total, elapsed, total / elapsed if elapsed else 0), fg='green')
+
+
+@index.command('rebuild-author-references')
+@click.option('--batch-size', type=int, default=1000, show_default=True,
+              help='Number of records committed at once.')
+@with_appcontext
+def rebuild_author_references(batch_size):
+    """Rebuild the index of the records referencing each author.
+
+    Only needed for records created before the index was introduced, it is
+    otherwise kept up to date when records are saved. Each batch of records
+    is committed separately, an interrupted run can be started again.
+    """
+    query = RecordMetadata.query.filter(
+        RecordMetadata.json.isnot(None)).order_by(RecordMetadata.id)
+    last_id, count = None, 0
+    while True:
+        batch = query
+        if last_id is not None:
+            batch = batch.filter(RecordMetadata.id > last_id)
+        models = batch.limit(batch_size).all()
+        if not models:
+            break
+        for model in models:
+            if not is_author(model.json):
+                AuthorReference.sync(model.id, author_refs(model.json))
+                count += 1
+        last_id = models[-1].id
+        db.session.commit()
+    click.secho('Author references of {0} records rebuilt.'.format(count),
+                fg='green')
+
+
+@click.group()
+def records():
+    """Records management commands."""
+
+
+@records.command('export')
+@click.argument('output', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('-t', '--pid-type', type=click.Choice(['recid', 'authid']),
+              default='recid', show_default=True)
+@click.option('--gzip', 'compress', is_flag=True, default=False,
+              help='Compress the output, default for ".gz" files.')
+@with_appcontext
+def export(output, pid_type, compress):
+    """Export all the records to a newline-delimited JSON file.
+
+    Records are not filtered by any permission.
+    """
+    search, pid_fetcher = export_search(pid_type, search_class=RecordsSearch)
+    serializer = export_serializer(pid_type)
+    if output == '-':
+        fp = click.get_binary_stream('stdout')
+        if compress:
+            # closing it writes the gzip trailer, not closing stdout
+            fp = gzip.GzipFile(fileobj=fp, mode='wb')
+    elif compress or output.endswith('.gz'):
+        fp = gzip.open(output, 'wb')
+    else:
+        fp = open(output, 'wb')
+    count = 0
+    try:
+        for line in export_records(search, pid_fetcher, serializer):
+            fp.write(line)
+            count += 1
+    finally:
+        if output != '-' or compress:
+            fp.close()
+    click.secho('Exported {0} records.'.format(count), fg='green', err=True)
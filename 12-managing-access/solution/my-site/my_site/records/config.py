@@ -9,14 +9,15 @@
 
 from __future__ import absolute_import, print_function
 
-from invenio_indexer.api import RecordIndexer
 from invenio_records_rest.facets import terms_filter
 from invenio_records_rest.utils import allow_all, check_elasticsearch
 from invenio_search import RecordsSearch
 
-from my_site.records.permissions import authenticated_user_permission,\
-    owner_permission_factory
-from my_site.records.search import OwnerRecordsSearch
+from my_site.records.api import Record
+from my_site.records.indexer import MySiteRecordIndexer
+from my_site.records.permissions import access_permission_factory, \
+    authenticated_user_permission, owner_permission_factory
+from my_site.records.search import AccessRecordsSearch
 
 
 def _(x):
@@ -26,13 +27,16 @@ def _(x):
 RECORDS_REST_ENDPOINTS = {
     'recid': dict(
         pid_type='recid',
-        pid_minter='recid',
+        pid_minter='my_site_recid',
         pid_fetcher='recid',
         default_endpoint_prefix=True,
-        search_class=OwnerRecordsSearch,
-        indexer_class=RecordIndexer,
+        record_class=Record,
+        search_class=AccessRecordsSearch,
+        indexer_class=MySiteRecordIndexer,
         search_index='records',
         search_type=None,
+        search_factory_imp='my_site.records.query'
+                           ':conditional_search_factory',
         record_serializers={
             'application/json': ('my_site.records.serializers'
                                  ':json_v1_response'),
@@ -46,12 +50,13 @@ RECORDS_REST_ENDPOINTS = {
                                  ':json_v1'),
         },
         list_route='/records/',
-        item_route='/records/<pid(recid):pid_value>',
+        item_route='/records/<cached_pid(recid,record_class='
+                   '"my_site.records.api:Record"):pid_value>',
         default_media_type='application/json',
         max_result_window=10000,
         error_handlers=dict(),
         create_permission_factory_imp=authenticated_user_permission,
-        read_permission_factory_imp=owner_permission_factory,
+        read_permission_factory_imp=access_permission_factory,
         update_permission_factory_imp=owner_permission_factory,
         delete_permission_factory_imp=owner_permission_factory,
         list_permission_factory_imp=allow_all
@@ -65,7 +70,7 @@ RECORDS_UI_ENDPOINTS = {
         'route': '/records/<pid_value>',
         'template': 'records/record.html',
         'permission_factory_imp': 'my_site.records.permissions:'
-                                  'owner_permission_factory',
+                                  'access_permission_factory',
     },
 }
 """Records UI for my-site."""
@@ -78,6 +83,130 @@ PIDSTORE_RECID_FIELD = 'id'
 MY_SITE_ENDPOINTS_ENABLED = True
 """Enable/disable automatic endpoint registration."""
 
+MY_SITE_DEPOSIT_INDEXING = 'sync'
+"""How deposited records are indexed: ``sync`` (within the transaction),
+``after_commit`` (synchronously, once committed) or ``queue`` (through the
+bulk indexing queue)."""
+
+MY_SITE_DEPOSIT_PENDING_TTL = 300
+"""Seconds during which a deposited record is shown to its owner as being
+indexed, unless ``MY_SITE_DEPOSIT_INDEXING`` is ``sync``."""
+
+MY_SITE_PID_BLOCK_SIZE = 1000
+"""Number of record identifiers reserved at once by each process."""
+
+MY_SITE_PERMISSION_CACHE_TTL = 0
+"""Seconds during which the expansion of the owner permissions is shared
+across requests, ``0`` only memoizes the checks within a request."""
+
+MY_SITE_RECORDS_OWNER_ROUTING = False
+"""Store the records of an owner in a single shard and only search that
+shard for the records of the current user. The records must be reindexed
+after changing it, e.g. with ``my-site index reindex-parallel -t recid
+--blue-green``. Records deleted through the indexing queue should be given
+to ``bulk_delete`` instead of their UUIDs, so that it sends their routing."""
+
+MY_SITE_RECORDS_READ_ROLES = []
+"""Roles allowed to read all the records, besides their owner. The records
+must be reindexed after changing it."""
+
+MY_SITE_RESPONSE_CACHE_SIZE = 1000
+"""Number of serialized records cached in process, ``0`` disables it."""
+
+MY_SITE_RESPONSE_CACHE_TIMEOUT = 3600
+"""Seconds serialized records are kept in the shared cache, ``0`` disables
+it."""
+
+MY_SITE_SEARCH_CACHE_TIMEOUT = 60
+"""Seconds serialized search results are kept in the shared cache, ``0``
+disables it.
+
+Searches are validated by the generation of the indexed documents, which
+changes whenever one is written: any write invalidates all the cached
+results."""
+
+MY_SITE_SEARCH_REFRESH_INTERVAL = 1
+"""Seconds after a write during which search results are not cached, which
+should match the refresh interval of the indices."""
+
+MY_SITE_SEARCH_CURSOR_KEEP_ALIVE = '1m'
+"""How long the point in time of a cursor search is kept between pages."""
+
+MY_SITE_EXPORT_BATCH_SIZE = 1000
+"""Number of records fetched per scroll request of an export."""
+
+MY_SITE_EXPORT_SCROLL = '5m'
+"""How long the scroll context of an export is kept between batches."""
+
+MY_SITE_PID_CACHE_SIZE = 10000
+"""Number of resolved PIDs cached in process, ``0`` disables it."""
+
+MY_SITE_PID_CACHE_LOCAL_TTL = 10
+"""Seconds resolved PIDs are cached in process, which is how long other
+processes may miss a change of a PID."""
+
+MY_SITE_PID_CACHE_TIMEOUT = 300
+"""Seconds resolved PIDs are kept in the shared cache, ``0`` disables it."""
+
+MY_SITE_VALIDATORS_WARM = [
+    'records/record-v1.0.0.json',
+    'authors/author-v1.0.0.json',
+]
+"""Schemas resolved when the application is created, before it forks."""
+
+MY_SITE_SINGLE_PASS_VALIDATION = False
+"""Do not validate against the JSON Schema the fields of the created records
+already validated by the REST loader.
+
+The loader then enforces the constraints of the JSON Schema on these fields:
+at least one contributor, a known contributor role, unique ids and
+affiliations. Payloads breaking them are rejected with a 400 error either
+way, by the loader instead of the JSON Schema validation.
+"""
+
+MY_SITE_BULK_BATCH_SIZE = 500
+"""Number of records created per transaction by the bulk endpoints."""
+
+MY_SITE_AUTHOR_REINDEX_DEBOUNCE = 60
+"""Seconds during which updates of an author are coalesced in one reindex
+of the records referencing it."""
+
+MY_SITE_INDEXER_BATCH_SIZE = 500
+"""Number of queued records whose authors are resolved at once."""
+
+MY_SITE_INDEXER_STAGES_MEMO_SIZE = 10000
+"""Number of stage outputs remembered to skip stages with unchanged inputs.
+
+Set to ``0`` to always run all the indexer stages.
+"""
+
+MY_SITE_INDEXER_SKIP_UNCHANGED = True
+"""Do not send documents identical to the already indexed ones.
+
+The documents are compared to the hashes of the ones written to the same
+concrete index, so that a recreated index is filled again. Explicit
+reindexing (``my-site index reindex-parallel``) always writes them.
+
+Hashes cover the whole document and its version: every new revision of a
+record is written, keeping ``_updated`` and the version used by ``If-Match``
+up to date, and only repeated indexing of the same revision (e.g. when the
+authors it references are reindexed without changes) is skipped. Disable it
+if documents are also written by other means, which the hashes would not
+reflect.
+"""
+
+MY_SITE_INDEXER_HASH_TIMEOUT = 7 * 24 * 3600
+"""Seconds the hashes of the indexed documents are kept in the cache."""
+
+MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL = 10
+"""Seconds between two checks for an index being rebuilt (blue/green)."""
+
+MY_SITE_AUTHOR_RESOLVER_CACHE_SIZE = 10000
+"""Number of resolved authors shared across requests, ``0`` disables it.
+
+Resolved authors are always cached for the duration of a request.
+"""
+
 
 RECORDS_REST_FACETS = dict(
     records=dict(
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Export of records as newline-delimited JSON."""
+
+from __future__ import absolute_import, print_function
+
+import json
+import zlib
+
+from elasticsearch.helpers import scan
+from flask import current_app
+from invenio_pidstore import current_pidstore
+from invenio_records_rest.utils import obj_or_import_string
+from invenio_search import current_search_client
+
+
+def export_search(pid_type, search_class=None):
+    """Search of all the records of an endpoint.
+
+    :param pid_type: The PID type of the ``RECORDS_REST_ENDPOINTS`` entry.
+    :param search_class: Search class to use instead of the one of the
+        endpoint, and of its default permission filter.
+    :returns: A ``(search, pid_fetcher)`` tuple.
+    """
+    endpoint = current_app.config['RECORDS_REST_ENDPOINTS'][pid_type]
+    search_class = search_class or obj_or_import_string(
+        endpoint['search_class'])
+    search = search_class(index=endpoint['search_index']).params(
+        version=True)
+    pid_fetcher = current_pidstore.fetchers[endpoint['pid_fetcher']]
+    return search, pid_fetcher
+
+
+def export_serializer(pid_type):
+    """Serializer of the search hits of an endpoint.
+
+    :param pid_type: The PID type of the ``RECORDS_REST_ENDPOINTS`` entry.
+    :returns: The serializer wrapped by the ``application/json`` search
+        response factory of the endpoint.
+    """
+    endpoint = current_app.config['RECORDS_REST_ENDPOINTS'][pid_type]
+    view = obj_or_import_string(
+        endpoint['search_serializers']['application/json'])
+    serializer = getattr(view, 'serializer', None)
+    if serializer is None:
+        raise ValueError(
+            'The search serializer of {0} does not expose its serializer.'
+            .format(pid_type))
+    return serializer
+
+
+def export_records(search, pid_fetcher, serializer, links_factory=None):
+    """Serialize the hits of a search as lines of JSON.
+
+    Hits are scrolled through in batches of ``MY_SITE_EXPORT_BATCH_SIZE``,
+    so that memory use does not depend on the number of records.
+
+    :param search: The search, with its filters.
+    :param pid_fetcher: The PID fetcher of the records.
+    :param serializer: Serializer transforming each hit.
+    :param links_factory: Factory function for record links.
+    :returns: A generator of encoded lines.
+    """
+    hits = scan(
+        current_search_client,
+        query=search.to_dict(),
+        index=search._index,
+        size=current_app.config['MY_SITE_EXPORT_BATCH_SIZE'],
+        scroll=current_app.config['MY_SITE_EXPORT_SCROLL'],
+        **search._params
+    )
+    for hit in hits:
+        pid = pid_fetcher(hit['_id'], hit['_source'])
+        data = serializer.transform_search_hit(
+            pid, hit, links_factory=links_factory)
+        line = json.dumps(data, separators=(',', ':')) + '\n'
+        yield line.encode('utf-8')
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of chunks on the fly in the gzip format."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
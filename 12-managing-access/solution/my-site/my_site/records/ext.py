@@ -10,23 +10,86 @@
 from __future__ import absolute_import, print_function
 
 from invenio_indexer.signals import before_record_index
+from invenio_pidstore.models import PersistentIdentifier
+from invenio_records.signals import after_record_delete, \
+    after_record_insert, after_record_update
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .cache import LRUCache
 from .indexer import indexer_receiver
+from .jsonresolvers import AuthorResolverCache, invalidate_author
+from .pipeline import IndexerPipeline
+from .providers import IdBlockAllocator
+from .receivers import create_author_references, \
+    delete_author_references, schedule_author_reindex, \
+    update_author_references
+from .resolver import CachedPIDConverter, pid_changed, pids_committed
+from .serializers.response import record_if_match
+from .validators import ValidatorRegistry
 from . import config
 
+DEPOSIT_INDEXING_MODES = ('sync', 'after_commit', 'queue')
+"""Values of ``MY_SITE_DEPOSIT_INDEXING``."""
+
 
 class Mysite(object):
     """My site extension."""
 
-    def __init__(self, app=None):
+    def __init__(self, app=None,
+                 entry_point_group='my_site.records.indexer_stages'):
         """Extension initialization."""
+        self.entry_point_group = entry_point_group
         if app:
             self.init_app(app)
 
     def init_app(self, app):
         """Flask application initialization."""
         self.init_config(app)
+        self.indexer_pipeline = IndexerPipeline(
+            entry_point_group=self.entry_point_group,
+            memo_size=app.config['MY_SITE_INDEXER_STAGES_MEMO_SIZE'])
+        self.author_cache = AuthorResolverCache(
+            maxsize=app.config['MY_SITE_AUTHOR_RESOLVER_CACHE_SIZE'])
+        self.dualwrite_cache = LRUCache(
+            maxsize=128,
+            ttl=app.config['MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL'])
+        self.index_uuid_cache = LRUCache(
+            maxsize=128,
+            ttl=app.config['MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL'])
+        self.pid_allocator = IdBlockAllocator(
+            block_size=app.config['MY_SITE_PID_BLOCK_SIZE'])
+        ttl = app.config['MY_SITE_PERMISSION_CACHE_TTL']
+        self.permission_cache = LRUCache(
+            maxsize=1024 if ttl else 0, ttl=ttl)
+        # compiled filters of the manager search, see the extras
+        self.role_filters = LRUCache(maxsize=1024)
+        self.response_cache = LRUCache(
+            maxsize=app.config['MY_SITE_RESPONSE_CACHE_SIZE'])
+        self.pid_cache = LRUCache(
+            maxsize=app.config['MY_SITE_PID_CACHE_SIZE'],
+            ttl=app.config['MY_SITE_PID_CACHE_LOCAL_TTL'])
+        app.url_map.converters['cached_pid'] = CachedPIDConverter
+        app.before_request(record_if_match)
+        self.validators = ValidatorRegistry()
         app.extensions['my-site'] = self
+        for identifier in ('after_insert', 'after_update', 'after_delete'):
+            if not event.contains(
+                    PersistentIdentifier, identifier, pid_changed):
+                event.listen(PersistentIdentifier, identifier, pid_changed)
+        if not event.contains(Session, 'after_commit', pids_committed):
+            event.listen(Session, 'after_commit', pids_committed)
         before_record_index.connect(indexer_receiver, sender=app, weak=False)
+        after_record_update.connect(invalidate_author, sender=app, weak=False)
+        after_record_delete.connect(invalidate_author, sender=app, weak=False)
+        after_record_insert.connect(
+            create_author_references, sender=app, weak=False)
+        after_record_update.connect(
+            update_author_references, sender=app, weak=False)
+        after_record_delete.connect(
+            delete_author_references, sender=app, weak=False)
+        after_record_update.connect(
+            schedule_author_reindex, sender=app, weak=False)
 
     def init_config(self, app):
         """Initialize configuration.
@@ -50,3 +113,9 @@ class Mysite(object):
                     if k == n and with_endpoints:
                         app.config.setdefault(n, {})
                         app.config[n].update(getattr(config, k))
+        if app.config['MY_SITE_DEPOSIT_INDEXING'] not in \
+                DEPOSIT_INDEXING_MODES:
+            raise ValueError(
+                'MY_SITE_DEPOSIT_INDEXING must be one of {0}, not {1!r}.'
+                .format(', '.join(DEPOSIT_INDEXING_MODES),
+                        app.config['MY_SITE_DEPOSIT_INDEXING']))
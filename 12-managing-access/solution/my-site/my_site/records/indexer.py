@@ -2,6 +2,36 @@
 
 from __future__ import absolute_import, print_function
 
+import hashlib
+import re
+from collections import deque
+
+from celery import current_app as current_celery_app
+from elasticsearch.exceptions import NotFoundError
+from elasticsearch.helpers import BulkIndexError, streaming_bulk
+from flask import current_app
+from invenio_cache import current_cache
+from invenio_indexer.api import RecordIndexer
+from kombu.compat import Consumer
+
+from .jsonresolvers import is_author
+from .pipeline import json_dumps
+from .proxies import current_author_cache, current_my_site
+from .query import bump_search_generation
+from .signals import record_indexed
+
+DUALWRITE_SUFFIX = '-dualwrite'
+"""Suffix of the alias receiving a copy of the writes to an index."""
+
+HASH_FLUSH_SIZE = 1000
+"""Number of hashes of written documents stored in the cache at once."""
+
+HASH_KEY = '_my_site_hash'
+"""Key of the ``(cache key, hash)`` of a document in its bulk action."""
+
+AUTHOR_REF_RE = re.compile(r'/api/resolver/author/(?P<authid>[^/]+)$')
+"""Pattern of the ``$ref`` URLs pointing to an author."""
+
 
 def indexer_receiver(
         sender,
@@ -20,11 +50,478 @@ def indexer_receiver(
     :param doc_type: The doc_type for the record.
     :param arguments: The arguments to pass to Elasticsearch for indexing.
     """
+    # run the registered stages, e.g. deleting the `keywords` field and
+    # adding the number of contributors
+    current_my_site.indexer_pipeline.run(json, record=record)
+    # store the records of an owner in the same shard
+    routing = owner_routing(record)
+    if routing is not None and arguments is not None:
+        arguments['routing'] = routing
+
+
+def owner_routing(record):
+    """Return the routing value of a record, if routing by owner."""
+    if not current_app.config['MY_SITE_RECORDS_OWNER_ROUTING'] or \
+            record is None or is_author(record):
+        return None
+    owner = record.get('owner')
+    return str(owner) if owner is not None else None
+
+
+def author_refs(data):
+    """Return the ids of the authors referenced in the given record data."""
+    authids = set()
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            ref = value.get('$ref')
+            if isinstance(ref, str):
+                match = AUTHOR_REF_RE.search(ref)
+                if match:
+                    authids.add(match.group('authid'))
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return authids
+
+
+def prefetch_authors(records):
+    """Resolve all the authors referenced by a batch of records at once.
+
+    Distinct author references are fetched with a single query and stored in
+    the author resolver cache, so that replacing the references of each
+    record does not hit the database anymore.
+
+    :param records: Iterable of record data.
+    :returns: The number of prefetched authors.
+    """
+    authids = set()
+    for data in records:
+        authids |= author_refs(data)
+    return current_author_cache.fetch(authids)
+
+
+def content_hash(body, version=None):
+    """Hash an indexed document and its version.
+
+    The whole document is hashed, so that a new revision of a record, whose
+    ``_updated`` date changed, is always written with its version.
+    """
+    return hashlib.sha1(
+        json_dumps([version, body]).encode('utf-8')).hexdigest()
+
+
+class MySiteRecordIndexer(RecordIndexer):
+    """Record indexer resolving the author references in batches.
+
+    When consuming the bulk indexing queue, messages are processed in batches
+    of ``MY_SITE_INDEXER_BATCH_SIZE``: the records of a batch are fetched with
+    one query, and all the authors they reference with another one, before
+    the documents are prepared.
+
+    While an index is being rebuilt (see ``my-site index reindex-parallel
+    --blue-green``), every write to it is also sent to the new index, found
+    through the ``<index>-dualwrite`` alias.
+
+    If ``MY_SITE_INDEXER_SKIP_UNCHANGED`` is enabled, a hash of each written
+    document is kept in the cache and documents identical to the indexed
+    ones are not sent again. Hashes are keyed by the UUID of the concrete
+    index, so that they do not apply to a recreated index, and only stored
+    once Elasticsearch acknowledged the write. ``stats`` counts the skipped
+    and written documents.
+
+    Each write invalidates the validators of the searches, see
+    :func:`~my_site.records.query.bump_search_generation`: directly for
+    single documents, and in :meth:`publish` for bulk requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize indexer."""
+        super(MySiteRecordIndexer, self).__init__(*args, **kwargs)
+        self._prefetched = {}
+        self._written_indices = set()
+        self.stats = dict(skipped=0, written=0)
+
+    def prefetch(self, record_ids):
+        """Load a batch of records and the authors they reference."""
+        records = self.record_cls.get_records(record_ids)
+        self._prefetched = {str(record.id): record for record in records}
+        prefetch_authors(self._prefetched.values())
+
+    def dualwrite_target(self, index):
+        """Return the alias to which writes to ``index`` are copied, if any.
+
+        The existence of the alias is checked at most every
+        ``MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL`` seconds.
+        """
+        alias = index + DUALWRITE_SUFFIX
+        cache = current_my_site.dualwrite_cache
+        exists = cache.get(alias)
+        if exists is None:
+            exists = bool(self.client.indices.exists_alias(name=alias))
+            cache.set(alias, exists)
+        return alias if exists else None
+
+    def index_uuid(self, index):
+        """Return the UUID of the concrete index behind an index or alias.
+
+        It is cached for ``MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL`` seconds.
+
+        :returns: The UUID, or ``None`` if the index does not exist.
+        """
+        cache = current_my_site.index_uuid_cache
+        uuid = cache.get(index)
+        if uuid is None:
+            try:
+                settings = self.client.indices.get_settings(
+                    index=index, name='index.uuid')
+            except NotFoundError:
+                return None
+            uuid = ','.join(sorted(
+                data['settings']['index']['uuid']
+                for data in settings.values()))
+            cache.set(index, uuid)
+        return uuid
+
+    def index(self, record, arguments=None, **kwargs):
+        """Index a record, copying it to the dual-write index if any."""
+        index, doc_type = self.record_to_index(record)
+        arguments = arguments or {}
+        body = self._prepare_record(
+            record, index, doc_type, arguments, **kwargs)
+        index, doc_type = self._prepare_index(index, doc_type)
+
+        key, digest = self._hash_entry(record, index, body)
+        if key and current_cache.get(key) == digest:
+            self.stats['skipped'] += 1
+            return dict(_id=str(record.id), _index=index, result='noop')
+
+        targets = [index, self.dualwrite_target(index)]
+        results = [
+            self.client.index(
+                id=str(record.id),
+                version=record.revision_id,
+                version_type=self._version_type,
+                index=target,
+                doc_type=doc_type,
+                body=body,
+                **arguments
+            ) for target in targets if target
+        ]
+        self.stats['written'] += 1
+        bump_search_generation()
+        if key:
+            current_cache.set(key, digest, timeout=self._hash_timeout)
+        record_indexed.send(
+            current_app._get_current_object(), record_id=str(record.id),
+            json=body)
+        return results[0]
+
+    def delete(self, record, **kwargs):
+        """Delete a record, also from the dual-write index if any."""
+        index, doc_type = self.record_to_index(record)
+        index, doc_type = self._prepare_index(index, doc_type)
+        self._forget_hash(record.id, index)
+        routing = owner_routing(record)
+        if routing is not None:
+            kwargs.setdefault('routing', routing)
+        result = self.client.delete(
+            id=str(record.id), index=index, doc_type=doc_type, **kwargs)
+        target = self.dualwrite_target(index)
+        if target:
+            self.client.delete(
+                id=str(record.id), index=target, doc_type=doc_type,
+                ignore=[404], **kwargs)
+        bump_search_generation()
+        return result
+
+    def bulk_delete(self, record_id_iterator):
+        """Bulk delete records from index.
+
+        Records can be given instead of their UUIDs: the routing of their
+        documents is then sent with the messages, as the owner of a deleted
+        record cannot be read anymore.
+
+        :param record_id_iterator: Iterator yielding records or record UUIDs.
+        """
+        with self.create_producer() as producer:
+            for rec in record_id_iterator:
+                payload = dict(id=str(getattr(rec, 'id', rec)), op='delete',
+                               index=None, doc_type=None)
+                routing = owner_routing(rec) if isinstance(rec, dict) \
+                    else None
+                if routing is not None:
+                    payload['routing'] = routing
+                producer.publish(payload)
+
+    def publish(self):
+        """Make the documents written by bulk requests searchable.
+
+        The written indices are refreshed, then the validators of the
+        searches invalidated, see
+        :func:`~my_site.records.query.bump_search_generation`.
+        """
+        if not self._written_indices:
+            return
+        self.client.indices.refresh(index=sorted(self._written_indices))
+        self._written_indices = set()
+        bump_search_generation()
+
+    def index_batch(self, record_ids, index=None, es_bulk_kwargs=None):
+        """Index a batch of records directly, with a single bulk request.
+
+        Unchanged documents are written anyway, as reindexing is requested
+        explicitly. Documents of which a newer version is already indexed,
+        e.g. by the indexing queue, are version conflicts counted as indexed.
+        Call :meth:`publish` once all the batches are written.
+
+        :param record_ids: Record UUIDs to index.
+        :param index: Index to write to, instead of the one of each record.
+        :param dict es_bulk_kwargs: Passed to
+            :func:`elasticsearch:elasticsearch.helpers.streaming_bulk`.
+        :returns: The number of indexed records.
+        """
+        with current_author_cache.scope():
+            self.prefetch(record_ids)
+            try:
+                actions = [
+                    self._record_action(
+                        record, index=index, skip_unchanged=False)
+                    for record in self._prefetched.values()
+                ]
+            finally:
+                self._prefetched = {}
+        if not actions:
+            return 0
+        if not index:
+            actions = list(self._with_dualwrite(actions))
+        success, _ = self._bulk(
+            actions, ignore_conflicts=True, **(es_bulk_kwargs or {}))
+        return success
+
+    def process_bulk_queue(self, es_bulk_kwargs=None):
+        """Process the bulk indexing queue, reporting skipped documents.
+
+        Same as :meth:`invenio_indexer.api.RecordIndexer.process_bulk_queue`,
+        storing the hashes of the written documents.
+
+        :returns: A ``(success, failed)`` tuple.
+        """
+        with current_celery_app.pool.acquire(block=True) as conn:
+            consumer = Consumer(
+                connection=conn,
+                queue=self.mq_queue.name,
+                exchange=self.mq_exchange.name,
+                routing_key=self.mq_routing_key,
+            )
+            kwargs = dict(
+                request_timeout=current_app.config[
+                    'INDEXER_BULK_REQUEST_TIMEOUT'])
+            kwargs.update(es_bulk_kwargs or {})
+            count = self._bulk(
+                self._actionsiter(consumer.iterqueue()), **kwargs)
+            consumer.close()
+        self.publish()
+        current_app.logger.info(
+            'Bulk indexing: %(written)s documents written, %(skipped)s '
+            'unchanged documents skipped.', self.stats)
+        return count
+
+    def _bulk(self, actions, ignore_conflicts=False, **kwargs):
+        """Send bulk actions, storing the hashes of the written documents.
+
+        The written indices are remembered for :meth:`publish`, and
+        :data:`~my_site.records.signals.record_indexed` is sent for each
+        written record. Failed actions are raised once all of them are
+        sent, unless ``raise_on_error`` is false.
+
+        :param ignore_conflicts: Count version conflicts as successes.
+        :param kwargs: Passed to
+            :func:`elasticsearch:elasticsearch.helpers.streaming_bulk`.
+        :returns: A ``(success, failed)`` tuple.
+        """
+        app = current_app._get_current_object()
+        raise_on_error = kwargs.pop('raise_on_error', True)
+        sent = deque()
+
+        def tracked():
+            for action in actions:
+                sent.append((action.pop(HASH_KEY, None), action))
+                yield action
+
+        success, failed, hashes, errors = 0, 0, {}, []
+        try:
+            # results come in the order of the actions
+            for ok, item in streaming_bulk(
+                    self.client, tracked(), raise_on_error=False, **kwargs):
+                entry, action = sent.popleft()
+                if not ok:
+                    if ignore_conflicts and \
+                            next(iter(item.values())).get('status') == 409:
+                        # a newer version is already indexed
+                        success += 1
+                    else:
+                        failed += 1
+                        errors.append(item)
+                    continue
+                success += 1
+                index = next(iter(item.values())).get('_index')
+                if index:
+                    self._written_indices.add(index)
+                if action.get('_op_type') == 'index' and \
+                        not action['_index'].endswith(DUALWRITE_SUFFIX):
+                    record_indexed.send(
+                        app, record_id=action['_id'], json=action['_source'])
+                if entry:
+                    hashes[entry[0]] = entry[1]
+                    if len(hashes) >= HASH_FLUSH_SIZE:
+                        self._store_hashes(hashes)
+                        hashes = {}
+        finally:
+            self._store_hashes(hashes)
+        if errors and raise_on_error:
+            raise BulkIndexError(
+                '{0} document(s) failed to index.'.format(len(errors)),
+                errors)
+        return success, failed
+
+    @property
+    def _hash_timeout(self):
+        """Lifetime of the hashes of indexed documents."""
+        return current_app.config['MY_SITE_INDEXER_HASH_TIMEOUT']
+
+    def _hash_key(self, record_id, index):
+        """Cache key of the hash of a document, if enabled."""
+        if not current_app.config['MY_SITE_INDEXER_SKIP_UNCHANGED']:
+            return None
+        uuid = self.index_uuid(index)
+        if uuid is None:
+            return None
+        return 'my_site:indexed:{0}:{1}'.format(uuid, record_id)
+
+    def _hash_entry(self, record, index, body):
+        """Cache key and hash of the document of a record, if enabled."""
+        key = self._hash_key(record.id, index)
+        if key is None:
+            return None, None
+        return key, content_hash(body, version=record.revision_id)
+
+    def _forget_hash(self, record_id, index):
+        """Forget the hash of a deleted document."""
+        key = self._hash_key(record_id, index)
+        if key:
+            current_cache.delete(key)
+
+    def _store_hashes(self, hashes):
+        """Store the hashes of written documents."""
+        if hashes:
+            current_cache.set_many(hashes, timeout=self._hash_timeout)
+
+    def _with_dualwrite(self, actions):
+        """Duplicate the bulk actions targeting an index being rebuilt."""
+        for action in actions:
+            if action is None:
+                continue
+            yield action
+            target = self.dualwrite_target(action['_index'])
+            if not target:
+                continue
+            if action['_op_type'] == 'delete':
+                # the record may not have been copied yet
+                self.client.delete(
+                    id=action['_id'], index=target,
+                    doc_type=action.get('_type'), ignore=[404])
+            else:
+                copy = dict(action, _index=target)
+                copy.pop(HASH_KEY, None)
+                yield copy
+
+    def _actionsiter(self, message_iterator):
+        """Iterate bulk actions, pre-resolving authors batch by batch."""
+        batch_size = current_app.config['MY_SITE_INDEXER_BATCH_SIZE']
+        batch = []
+        for message in message_iterator:
+            batch.append(message)
+            if len(batch) >= batch_size:
+                for action in self._batch_actionsiter(batch):
+                    yield action
+                batch = []
+        if batch:
+            for action in self._batch_actionsiter(batch):
+                yield action
+
+    def _batch_actionsiter(self, messages):
+        """Iterate the bulk actions of one batch of messages."""
+        record_ids = [
+            payload['id'] for payload in (m.decode() for m in messages)
+            if payload['op'] == 'index'
+        ]
+        with current_author_cache.scope():
+            self.prefetch(record_ids)
+            try:
+                actions = super(MySiteRecordIndexer, self)._actionsiter(
+                    messages)
+                for action in self._with_dualwrite(actions):
+                    yield action
+            finally:
+                self._prefetched = {}
+
+    def _index_action(self, payload):
+        """Bulk index action, using the prefetched record if available."""
+        record = self._prefetched.pop(payload['id'], None)
+        if record is None:
+            record = self.record_cls.get_record(payload['id'])
+        return self._record_action(record)
+
+    def _delete_action(self, payload):
+        """Bulk delete action, forgetting the hash of the document."""
+        action = super(MySiteRecordIndexer, self)._delete_action(payload)
+        self._forget_hash(action['_id'], action['_index'])
+        if payload.get('routing'):
+            action['routing'] = payload['routing']
+        elif current_app.config['MY_SITE_RECORDS_OWNER_ROUTING']:
+            # queued by UUID, the owner of a deleted record is gone: ask the
+            # index
+            hits = self.client.search(
+                index=action['_index'],
+                body=dict(query=dict(ids=dict(values=[action['_id']]))),
+                _source=False,
+            )['hits']['hits']
+            if hits and hits[0].get('_routing'):
+                action['routing'] = hits[0]['_routing']
+        return action
+
+    def _record_action(self, record, index=None, skip_unchanged=True):
+        """Build the bulk index action of a record.
+
+        :param index: Index to write to, instead of the one of the record.
+        :param skip_unchanged: Skip the document if it did not change.
+        :returns: The action, or ``None`` if the document did not change.
+        """
+        record_index, doc_type = self.record_to_index(record)
+        arguments = {}
+        body = self._prepare_record(record, record_index, doc_type, arguments)
+        record_index, doc_type = self._prepare_index(record_index, doc_type)
+        index = index or record_index
 
-    # delete the `keywords` field before indexing
-    if 'keywords' in json:
-        del json['keywords']
+        key, digest = self._hash_entry(record, index, body)
+        if key and skip_unchanged and current_cache.get(key) == digest:
+            self.stats['skipped'] += 1
+            return None
+        self.stats['written'] += 1
 
-    # count the number of contributors and add the new field
-    contributors = json.get('contributors', [])
-    json['contributors_count'] = len(contributors)
+        action = {
+            '_op_type': 'index',
+            '_index': index,
+            '_type': doc_type,
+            '_id': str(record.id),
+            '_version': record.revision_id,
+            '_version_type': self._version_type,
+            '_source': body
+        }
+        action.update(arguments)
+        if key:
+            # stored by _bulk once the document is written
+            action[HASH_KEY] = (key, digest)
+        return action
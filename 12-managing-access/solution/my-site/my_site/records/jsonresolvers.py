@@ -2,18 +2,262 @@
 
 from __future__ import absolute_import, print_function
 
+import copy
+import threading
+from contextlib import contextmanager
+
 import jsonresolver
+from flask import g
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
 from invenio_pidstore.resolver import Resolver
 from invenio_records.api import Record
+from invenio_records.models import RecordMetadata
+
+from .cache import LRUCache
+from .proxies import current_author_cache
+
+
+def is_author(record):
+    """Check if the given record is an author record."""
+    return record.get('$schema', '').endswith('authors/author-v1.0.0.json')
+
+
+class AuthorResolverCache(object):
+    """Cache of resolved author references.
+
+    Resolved authors are kept in two layers: a scoped one, living for the
+    duration of a request (or of a bulk indexing batch, see :meth:`scope`),
+    and an optional bounded LRU shared across requests. Entries of the shared
+    layer are keyed by ``authid`` and only returned if the author revision
+    did not change, so a stale entry is never served.
+
+    Call :meth:`prefetch` with the authors referenced by a record before
+    replacing its references: their revisions are checked with a single
+    query, and the authors missing from the shared layer fetched with
+    another one.
+    """
+
+    def __init__(self, maxsize=0):
+        """Initialize the cache.
+
+        :param maxsize: Size of the shared layer, ``0`` disables it.
+        """
+        self.shared = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def scoped(self):
+        """Request/batch scoped layer."""
+        if 'my_site_author_cache' not in g:
+            g.my_site_author_cache = {}
+        return g.my_site_author_cache
+
+    @property
+    def scoped_revisions(self):
+        """Revisions of the authors looked up in the scope."""
+        if 'my_site_author_revisions' not in g:
+            g.my_site_author_revisions = {}
+        return g.my_site_author_revisions
+
+    @contextmanager
+    def scope(self):
+        """Open a new scoped layer, e.g. for a bulk indexing batch."""
+        previous = g.pop('my_site_author_cache', None)
+        previous_revisions = g.pop('my_site_author_revisions', None)
+        g.my_site_author_cache = {}
+        g.my_site_author_revisions = {}
+        try:
+            yield g.my_site_author_cache
+        finally:
+            g.my_site_author_cache = previous or {}
+            g.my_site_author_revisions = previous_revisions or {}
+
+    def _count(self, hits=0, misses=0):
+        """Update the hit/miss counters."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, authid):
+        """Return the resolved author, hitting the DB only on cache misses."""
+        authid = str(authid)
+        author = self.scoped.get(authid)
+        if author is not None:
+            self._count(hits=1)
+            return copy.deepcopy(author)
+
+        if self.shared.maxsize > 0:
+            author = self._get_shared(authid)
+        else:
+            self._count(misses=1)
+            author = self._resolve(authid)
+        self.scoped[authid] = author
+        return copy.deepcopy(author)
+
+    def put(self, authid, revision, author):
+        """Store an already fetched author, e.g. by a bulk pre-resolution."""
+        authid = str(authid)
+        author = self._dump(author)
+        self.scoped[authid] = author
+        self.scoped_revisions[authid] = revision
+        self.shared.set(authid, (revision, author))
+
+    def fetch(self, authids):
+        """Fetch registered authors from the database with a single query.
+
+        :param authids: Ids of the authors.
+        :returns: The number of fetched authors.
+        """
+        authids = {str(authid) for authid in authids}
+        if not authids:
+            return 0
+        rows = db.session.query(
+            PersistentIdentifier.pid_value, RecordMetadata
+        ).join(
+            RecordMetadata,
+            RecordMetadata.id == PersistentIdentifier.object_uuid,
+        ).filter(
+            PersistentIdentifier.pid_type == 'authid',
+            PersistentIdentifier.status == PIDStatus.REGISTERED,
+            PersistentIdentifier.pid_value.in_(authids),
+        )
+        count = 0
+        for pid_value, model in rows:
+            self.put(pid_value, model.version_id, model.json)
+            count += 1
+        return count
+
+    def prefetch(self, authids):
+        """Resolve the authors referenced by a record at once.
+
+        The shared entries are validated with a single query of the
+        revisions, and the stale or missing ones fetched with another one.
+        Unregistered authors are left to :meth:`get`, which raises the
+        proper error.
+
+        :param authids: Ids of the authors.
+        :returns: The number of authors fetched from the database.
+        """
+        authids = {str(authid) for authid in authids} - set(self.scoped)
+        if not authids:
+            return 0
+        missing = set()
+        hits = 0
+        for authid, revision in self.revisions(authids).items():
+            cached = self.shared.get(authid)
+            if cached is not None and cached[0] == revision:
+                self.scoped[authid] = cached[1]
+                hits += 1
+            else:
+                missing.add(authid)
+        self._count(hits=hits, misses=len(missing))
+        return self.fetch(missing)
+
+    def invalidate(self, authid):
+        """Remove an author from both layers."""
+        authid = str(authid)
+        self.scoped.pop(authid, None)
+        self.scoped_revisions.pop(authid, None)
+        self.shared.delete(authid)
+
+    @property
+    def stats(self):
+        """Hit/miss counters of the cache."""
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            shared=self.shared.stats,
+        )
+
+    def revisions(self, authids):
+        """Return the current revision of each registered author.
+
+        Revisions are looked up once per scope, with a single query.
+
+        :param authids: Ids of the authors.
+        :returns: A dictionary of authids to revisions.
+        """
+        authids = {str(authid) for authid in authids}
+        known = self.scoped_revisions
+        unknown = authids - set(known)
+        if unknown:
+            rows = dict(db.session.query(
+                PersistentIdentifier.pid_value,
+                RecordMetadata.version_id,
+            ).join(
+                RecordMetadata,
+                RecordMetadata.id == PersistentIdentifier.object_uuid,
+            ).filter(
+                PersistentIdentifier.pid_type == 'authid',
+                PersistentIdentifier.status == PIDStatus.REGISTERED,
+                PersistentIdentifier.pid_value.in_(unknown),
+            ))
+            for authid in unknown:
+                known[authid] = rows.get(authid)
+        return {
+            authid: known[authid] for authid in authids
+            if known[authid] is not None
+        }
+
+    def _get_shared(self, authid):
+        """Lookup the shared layer, validating the cached revision.
+
+        Used for the authors which were not prefetched, with one query each.
+        """
+        row = db.session.query(
+            PersistentIdentifier.object_uuid,
+            PersistentIdentifier.status,
+            RecordMetadata.version_id,
+        ).join(
+            RecordMetadata,
+            RecordMetadata.id == PersistentIdentifier.object_uuid,
+        ).filter(
+            PersistentIdentifier.pid_type == 'authid',
+            PersistentIdentifier.pid_value == authid,
+        ).one_or_none()
+        if row is None or row.status != PIDStatus.REGISTERED:
+            # let the resolver raise the proper PID error
+            self._count(misses=1)
+            return self._resolve(authid)
+
+        cached = self.shared.get(authid)
+        if cached is not None and cached[0] == row.version_id:
+            self._count(hits=1)
+            return cached[1]
+
+        self._count(misses=1)
+        author = self._dump(Record.get_record(row.object_uuid))
+        self.shared.set(authid, (row.version_id, author))
+        return author
+
+    def _resolve(self, authid):
+        """Resolve the author through its persistent identifier."""
+        # Setup a resolver to retrive an author record given its id
+        resolver = Resolver(
+            pid_type='authid', object_type="rec", getter=Record.get_record)
+        _, record = resolver.resolve(authid)
+        return self._dump(record)
+
+    @staticmethod
+    def _dump(record):
+        """Copy the author, stripping the fields not to be embedded."""
+        author = copy.deepcopy(dict(record))
+        # we could manipulate here the record and eventually add/remove fields
+        author.pop('$schema', None)
+        return author
+
+
+def invalidate_author(sender, record=None, **kwargs):
+    """Drop an updated or deleted author from the resolver cache."""
+    if record is not None and is_author(record) and 'id' in record:
+        current_author_cache.invalidate(record['id'])
 
 
 # the host corresponds to the config value for the key JSONSCHEMAS_HOST
 @jsonresolver.route('/api/resolver/author/<authid>', host='my-site.com')
 def record_jsonresolver(authid):
     """Resolve referenced author."""
-    # Setup a resolver to retrive an author record given its id
-    resolver = Resolver(pid_type='authid', object_type="rec", getter=Record.get_record)
-    _, record = resolver.resolve(str(authid))
-    # we could manipulate here the record and eventually add/remove fields
-    del record['$schema']
-    return record
+    return current_author_cache.get(authid)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Loaders.
+
+This file contains sample loaders that can be used to deserialize input data in
+an application level data structure. The validated_loader() method can be
+parameterized with different schemas for the record metadata. In the provided
+json_v1 instance, it uses the MetadataSchemaV1, defining the
+PersistentIdentifier field.
+
+With ``MY_SITE_SINGLE_PASS_VALIDATION`` enabled, the loaded data is a
+:class:`~my_site.records.validators.ValidatedData`, whose values for the
+fields fully validated by the marshmallow schema are not validated again
+against the JSON Schema when the record is created. The marshmallow schema
+then also enforces the constraints of the JSON Schema on these fields, see
+:func:`~my_site.records.marshmallow.json.single_pass`.
+"""
+
+from __future__ import absolute_import, print_function
+
+from flask import current_app, request
+from invenio_records_rest.loaders.marshmallow import MarshmallowErrors
+from marshmallow import ValidationError
+from marshmallow import __version_info__ as marshmallow_version
+
+from ..marshmallow import MetadataSchemaV1
+from ..validators import ValidatedData
+
+VALIDATED_FIELDS = ('contributors', 'keywords', 'owner', 'title')
+"""Fields of MetadataSchemaV1 at least as strict as the JSON Schema."""
+
+
+def validated_loader(schema_class, validated_fields=()):
+    """Marshmallow loader for JSON requests, marking the validated fields.
+
+    :param schema_class: The marshmallow schema of the data.
+    :param validated_fields: Fields whose loaded values are always valid
+        against the JSON Schema of the records.
+    :returns: A loader, taking the data to load instead of the body of the
+        request if given.
+    """
+    def json_loader(data=None):
+        if data is None:
+            data = request.get_json()
+
+        context = {}
+        pid_data = request.view_args.get('pid_value')
+        if pid_data:
+            pid, record = pid_data.data
+            context['pid'] = pid
+            context['record'] = record
+        if marshmallow_version[0] < 3:
+            result = schema_class(context=context).load(data)
+            if result.errors:
+                raise MarshmallowErrors(result.errors)
+            result = result.data
+        else:
+            try:
+                result = schema_class(context=context).load(data)
+            except ValidationError as error:
+                raise MarshmallowErrors(error.messages)
+
+        if current_app.config['MY_SITE_SINGLE_PASS_VALIDATION']:
+            return ValidatedData(result, validated_fields)
+        return result
+    return json_loader
+
+
+#: JSON loader using Marshmallow for data validation.
+json_v1 = validated_loader(MetadataSchemaV1, VALIDATED_FIELDS)
+
+__all__ = (
+    'json_v1',
+    'validated_loader',
+)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Dump functions generated from marshmallow schemas.
+
+A schema is compiled once into plain Python functions, one per (nested)
+schema, with the per-field work of the common field types inlined. The
+functions return the same data as ``Schema.dump`` for the fields they
+support; :func:`compile_dumper` raises :class:`UnsupportedSchema` for the
+others, which must then be dumped with marshmallow.
+
+Note that :class:`~invenio_records_rest.schemas.fields.SanitizedUnicode`
+only sanitizes values on load: stored values are dumped as plain strings,
+like marshmallow does.
+"""
+
+from __future__ import absolute_import, print_function
+
+import functools
+from inspect import getfullargspec, isfunction, ismethod
+
+from marshmallow import Schema, fields, missing
+from marshmallow.utils import ensure_text_type, is_collection
+
+
+class UnsupportedSchema(Exception):
+    """The schema uses features the dumper cannot compile."""
+
+
+def _get(obj, key):
+    """Get a value like marshmallow's default accessor."""
+    if not hasattr(obj, '__getitem__'):
+        return getattr(obj, key, missing)
+    try:
+        return obj[key]
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return getattr(obj, key, missing)
+
+
+def _func_args(func):
+    """Number of arguments of a function field serializer."""
+    if isinstance(func, functools.partial):
+        return _func_args(func.func)
+    if not (isfunction(func) or ismethod(func)):
+        func = func.__call__
+    return len(getfullargspec(func).args)
+
+
+def _dump_hooks(schema):
+    """Return the pre and post dump processors of a schema."""
+    hooks = getattr(schema, '_hooks', None)  # marshmallow 3
+    if hooks is None:
+        hooks = getattr(schema, '__processors__', {})
+    return [tag for tag in hooks if 'dump' in str(tag) and hooks[tag]]
+
+
+class DumperCompiler(object):
+    """Generate the source of the dump functions of a schema."""
+
+    def __init__(self):
+        """Initialize the compiler."""
+        self.lines = []
+        self.namespace = dict(
+            missing=missing,
+            _get=_get,
+            _text=ensure_text_type,
+            _is_collection=is_collection,
+        )
+        self.functions = {}
+
+    def compile(self, schema_class):
+        """Return the dump function of a schema class."""
+        name = self._function(schema_class)
+        source = '\n'.join(self.lines)
+        exec(compile(source, '<dumper {0}>'.format(
+            schema_class.__name__), 'exec'), self.namespace)
+        dump = self.namespace[name]
+        dump.source = source
+        return dump
+
+    def _constant(self, value):
+        """Add a value to the namespace of the generated code."""
+        name = '_c{0}'.format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def _function(self, schema_class):
+        """Generate the function dumping a schema, returning its name."""
+        if schema_class in self.functions:
+            return self.functions[schema_class]
+        name = 'dump_{0}_{1}'.format(
+            schema_class.__name__, len(self.functions))
+        self.functions[schema_class] = name
+
+        schema = schema_class()
+        opts = schema.opts
+        if _dump_hooks(schema) or getattr(schema, 'prefix', '') or \
+                opts.fields or opts.additional or opts.exclude or \
+                schema.only or schema.exclude or \
+                type(schema).get_attribute is not Schema.get_attribute:
+            raise UnsupportedSchema(schema_class.__name__)
+
+        body = []
+        for field_name, field in sorted(schema.fields.items()):
+            if field.load_only:
+                continue
+            body.extend(self._field(field_name, field))
+        lines = ['def {0}(obj, context):'.format(name), '    out = {}']
+        lines.extend('    ' + line for line in body)
+        lines.extend(['    return out', ''])
+        self.lines.extend(lines)
+        return name
+
+    def _field(self, field_name, field):
+        """Generate the statements dumping a field of ``obj`` to ``out``."""
+        attribute = field.attribute or field_name
+        key = getattr(field, 'data_key', None) or \
+            getattr(field, 'dump_to', None) or field_name
+        default = getattr(field, 'dump_default', getattr(
+            field, 'default', missing))
+        if '.' in attribute or default is not missing:
+            raise UnsupportedSchema(field_name)
+
+        if isinstance(field, fields.Function):
+            if field.serialize_func is None:
+                return []
+            func = self._constant(field.serialize_func)
+            nargs = _func_args(field.serialize_func)
+            if type(field)._call_or_raise is fields.Function._call_or_raise:
+                # only the Invenio Function field passes the data
+                nargs = min(nargs, 2)
+            args = ['obj', 'context', 'None'][:max(min(nargs, 3), 1)]
+            return [
+                'try:',
+                '    value = {0}({1})'.format(func, ', '.join(args)),
+                'except AttributeError:',
+                '    value = missing',
+                'if value is not missing:',
+                '    out[{0!r}] = value'.format(key),
+            ]
+
+        if not field._CHECK_ATTRIBUTE:
+            raise UnsupportedSchema(field_name)
+
+        expression = self._expression(field, 'value', attribute)
+        lines = [
+            'value = _get(obj, {0!r})'.format(attribute),
+            'if value is not missing:',
+        ]
+        if expression is None:
+            lines.extend([
+                '    value = {0}._serialize(value, {1!r}, obj)'.format(
+                    self._constant(field), attribute),
+                '    if value is not missing:',
+                '        out[{0!r}] = value'.format(key),
+            ])
+        else:
+            lines.append('    out[{0!r}] = {1}'.format(key, expression))
+        return lines
+
+    def _expression(self, field, var, attribute, depth=0):
+        """Inline expression serializing ``var``, or ``None`` if unknown."""
+        serialize = type(field)._serialize
+        if serialize is fields.String._serialize:
+            return '(None if {0} is None else {0} if {0}.__class__ is str ' \
+                   'else _text({0}))'.format(var)
+        if serialize is fields.Number._serialize and \
+                field.num_type is int and \
+                type(field)._format_num is fields.Number._format_num and \
+                not field.as_string and not getattr(field, 'strict', False):
+            return '(None if {0} is None else int({0}))'.format(var)
+        if serialize in (fields.Field._serialize, fields.Raw._serialize):
+            return var
+        if serialize is fields.List._serialize:
+            inner = getattr(field, 'inner', None) or field.container
+            item = 'e{0}'.format(depth)
+            return ('(None if {var} is None else '
+                    '[{expr} for {item} in {var}] if _is_collection({var}) '
+                    'else [{single}])').format(
+                        var=var, item=item,
+                        expr=self._item(inner, item, attribute, depth + 1),
+                        single=self._item(inner, var, attribute, depth + 1))
+        if serialize is fields.Nested._serialize:
+            if field.only or field.exclude:
+                raise UnsupportedSchema(attribute)
+            nested = field.schema
+            function = self._function(type(nested))
+            if nested.many or field.many:
+                return ('(None if {var} is None else '
+                        '[{func}(e, context) for e in {var}])').format(
+                            var=var, func=function)
+            return '(None if {0} is None else {1}({0}, context))'.format(
+                var, function)
+        return None
+
+    def _item(self, field, var, attribute, depth):
+        """Expression serializing a list item."""
+        expression = self._expression(field, var, attribute, depth)
+        if expression is None:
+            expression = '{0}._serialize({1}, {2!r}, obj)'.format(
+                self._constant(field), var, attribute)
+        return expression
+
+
+def compile_dumper(schema_class):
+    """Compile the dump function of a schema class.
+
+    :param schema_class: A marshmallow schema class.
+    :returns: A function taking the object to dump and the marshmallow
+        context, and returning the dumped data.
+    :raises UnsupportedSchema: If the schema cannot be compiled.
+    """
+    return DumperCompiler().compile(schema_class)
@@ -9,10 +9,35 @@
 
 from __future__ import absolute_import, print_function
 
+import json
+
+from flask import current_app, has_app_context
 from invenio_records_rest.schemas import Nested, StrictKeysMixin
 from invenio_records_rest.schemas.fields import DateString, \
     PersistentIdentifier, SanitizedUnicode
-from marshmallow import fields, missing, validate
+from marshmallow import ValidationError, fields, missing, validate
+
+
+def unique_items(value):
+    """Validate that the items of a list are unique."""
+    items = [json.dumps(item, sort_keys=True) for item in value]
+    if len(set(items)) != len(items):
+        raise ValidationError('Items must be unique.')
+
+
+def single_pass(validator):
+    """Apply a validator only with ``MY_SITE_SINGLE_PASS_VALIDATION``.
+
+    These validators enforce constraints of the JSON Schema of the records,
+    so that the loaded fields need not be validated against it again. They
+    are not applied otherwise, as the created records are then fully
+    validated against it.
+    """
+    def validate_single_pass(value):
+        if has_app_context() and \
+                current_app.config.get('MY_SITE_SINGLE_PASS_VALIDATION'):
+            validator(value)
+    return validate_single_pass
 
 
 class PersonIdsSchemaV1(StrictKeysMixin):
@@ -25,10 +50,13 @@ class PersonIdsSchemaV1(StrictKeysMixin):
 class ContributorSchemaV1(StrictKeysMixin):
     """Contributor schema."""
 
-    ids = fields.Nested(PersonIdsSchemaV1, many=True)
+    ids = fields.Nested(PersonIdsSchemaV1, many=True,
+                        validate=single_pass(unique_items))
     name = SanitizedUnicode(required=True)
-    role = SanitizedUnicode()
-    affiliations = fields.List(SanitizedUnicode())
+    role = SanitizedUnicode(validate=single_pass(
+        validate.OneOf(['ContactPerson', 'Researcher', 'Other'])))
+    affiliations = fields.List(SanitizedUnicode(),
+                               validate=single_pass(unique_items))
     email = fields.Email()
 
 
@@ -39,7 +67,8 @@ class MetadataSchemaV1(StrictKeysMixin):
     title = SanitizedUnicode(required=True, validate=validate.Length(min=3))
     keywords = fields.List(SanitizedUnicode(), many=True)
     publication_date = DateString()
-    contributors = Nested(ContributorSchemaV1, many=True, required=True)
+    contributors = Nested(ContributorSchemaV1, many=True, required=True,
+                          validate=single_pass(validate.Length(min=1)))
     owner = fields.Integer()
 
 
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""My site minters."""
+
+from __future__ import absolute_import, print_function
+
+from flask import current_app
+
+from .providers import BlockRecordIdProvider
+
+
+def recid_minter(record_uuid, data):
+    """Mint a record identifier from the block of the process."""
+    pid_field = current_app.config['PIDSTORE_RECID_FIELD']
+    assert pid_field not in data
+    provider = BlockRecordIdProvider.create(
+        object_type='rec',
+        object_uuid=record_uuid,
+    )
+    data[pid_field] = provider.pid.pid_value
+    return provider.pid
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Database models for My site records."""
+
+from __future__ import absolute_import, print_function
+
+from invenio_db import db
+from invenio_records.models import RecordMetadata
+from sqlalchemy_utils.types import UUIDType
+
+
+class AuthorReference(db.Model):
+    """Reverse index of the authors referenced by the records."""
+
+    __tablename__ = 'my_site_author_references'
+
+    authid = db.Column(db.String(255), primary_key=True)
+    """Persistent identifier of the referenced author."""
+
+    record_id = db.Column(
+        UUIDType,
+        db.ForeignKey(RecordMetadata.id, ondelete='CASCADE'),
+        primary_key=True,
+        index=True,
+    )
+    """Identifier of the referencing record."""
+
+    @classmethod
+    def sync(cls, record_id, authids, created=False):
+        """Set the authors referenced by a record.
+
+        :param record_id: The record UUID.
+        :param authids: The ids of the authors the record references.
+        :param created: If the record was just created, i.e. does not have
+            any reference yet.
+        """
+        authids = set(authids)
+        existing = set() if created else {
+            authid for (authid, ) in
+            db.session.query(cls.authid).filter_by(record_id=record_id)
+        }
+        stale = existing - authids
+        if stale:
+            cls.query.filter(
+                cls.record_id == record_id, cls.authid.in_(stale)
+            ).delete(synchronize_session=False)
+        for authid in authids - existing:
+            db.session.add(cls(authid=authid, record_id=record_id))
+
+    @classmethod
+    def record_ids(cls, authid):
+        """Iterate the UUIDs of the records referencing an author."""
+        query = db.session.query(cls.record_id).filter_by(
+            authid=str(authid)).yield_per(1000)
+        for (record_id, ) in query:
+            yield str(record_id)
@@ -1,15 +1,94 @@
+from flask import current_app, g, has_request_context
+from flask_principal import RoleNeed, UserNeed
 from invenio_access import Permission, action_factory, authenticated_user
-from flask_principal import UserNeed
+
+from .proxies import current_my_site
 
 
 create_records = action_factory("create-records")
 
 
+class CachedPermission(Permission):
+    """Permission memoizing its checks.
+
+    The result of :meth:`allows` is kept for the duration of the request,
+    keyed by the identity and the needs of the permission, so that checking
+    the same permission for many records costs a single evaluation.
+
+    If ``MY_SITE_PERMISSION_CACHE_TTL`` is set, the needs and excludes the
+    permission expands to (e.g. the users and roles granted the superuser
+    action) are also shared across requests for that many seconds.
+    """
+
+    def _load_permissions(self):
+        """Load permissions, from the shared cache if possible."""
+        cache = current_my_site.permission_cache
+        key = self._memo_key()
+        permissions = cache.get(key)
+        if permissions is None:
+            super(CachedPermission, self)._load_permissions()
+            cache.set(key, self._permissions)
+        else:
+            self._permissions = permissions
+
+    def allows(self, identity):
+        """Check if the identity is allowed, memoizing the result."""
+        if not has_request_context():
+            return super(CachedPermission, self).allows(identity)
+        if 'my_site_permissions' not in g:
+            g.my_site_permissions = {}
+        key = (identity.id, ) + self._memo_key()
+        allowed = g.my_site_permissions.get(key)
+        if allowed is None:
+            allowed = super(CachedPermission, self).allows(identity)
+            g.my_site_permissions[key] = allowed
+        return allowed
+
+    def _memo_key(self):
+        """Key identifying the permission."""
+        return (frozenset(self.explicit_needs),
+                frozenset(self.explicit_excludes))
+
+
+def record_read_needs(record):
+    """Needs allowed to read a record, as indexed in ``_access.read``.
+
+    :returns: A list of ``user:<id>`` and ``role:<name>`` strings: the owner
+        of the record, and the roles of ``MY_SITE_RECORDS_READ_ROLES``.
+    """
+    needs = []
+    if record.get('owner') is not None:
+        needs.append('user:{0}'.format(record['owner']))
+    needs.extend(
+        'role:{0}'.format(role)
+        for role in current_app.config['MY_SITE_RECORDS_READ_ROLES'])
+    return needs
+
+
+def identity_access_needs(identity):
+    """Needs provided by an identity, in the format of ``_access.read``."""
+    prefixes = dict(id='user', role='role')
+    return sorted(
+        '{0}:{1}'.format(prefixes[need.method], need.value)
+        for need in identity.provides if need.method in prefixes
+    )
+
+
+def access_permission_factory(record=None):
+    """Permission factory granting the needs of ``_access.read``."""
+    needs = []
+    for need in record_read_needs(record):
+        method, value = need.split(':', 1)
+        needs.append(
+            UserNeed(int(value)) if method == 'user' else RoleNeed(value))
+    return CachedPermission(*needs)
+
+
 def owner_permission_factory(record=None):
     """Permission factory with owner access."""
-    return Permission(UserNeed(record["owner"]))
+    return CachedPermission(UserNeed(record["owner"]))
 
 
 def authenticated_user_permission(record=None):
     """Return an object that evaluates if the current user is authenticated."""
-    return Permission(authenticated_user)
\ No newline at end of file
+    return Permission(authenticated_user)
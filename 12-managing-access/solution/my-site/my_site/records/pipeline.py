@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Enrichment pipeline applied to records before indexing.
+
+Stages are registered with the ``my_site.records.indexer_stages`` entry
+point group and run by ascending ``order`` over the dumped record.
+"""
+
+from __future__ import absolute_import, print_function
+
+import copy
+import hashlib
+import json
+import time
+
+import pkg_resources
+from flask import current_app
+
+from .cache import LRUCache
+from .permissions import record_read_needs
+
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, float('inf'))
+"""Upper bounds, in seconds, of the stage duration histograms."""
+
+
+class Stage(object):
+    """Base class of an enrichment stage."""
+
+    name = None
+    """Name of the stage, defaults to its entry point name."""
+
+    order = 0
+    """Stages run by ascending order."""
+
+    inputs = None
+    """Fields the stage depends on.
+
+    When set, the stage is skipped if none of them changed since the record
+    was last indexed, and its previous output is reused.
+    """
+
+    config = ()
+    """Configuration variables the stage depends on, as part of its inputs."""
+
+    removes = ()
+    """Fields removed from the document."""
+
+    def run(self, json):
+        """Compute the derived fields of a dumped record.
+
+        :param json: The dumped record.
+        :returns: A dictionary of fields to add to the document.
+        """
+        return {}
+
+
+class ReadAccess(Stage):
+    """Index the needs allowed to read a record in ``_access.read``."""
+
+    order = 5
+    inputs = ('owner', )
+    config = ('MY_SITE_RECORDS_READ_ROLES', )
+
+    def run(self, json):
+        """Compute the read needs, for the records having an owner."""
+        if json.get('owner') is None:
+            return {}
+        return {'_access': dict(read=record_read_needs(json))}
+
+
+class RemoveKeywords(Stage):
+    """Do not index the keywords."""
+
+    order = 10
+    removes = ('keywords', )
+
+
+class ContributorsCount(Stage):
+    """Count the number of contributors."""
+
+    order = 20
+    inputs = ('contributors', )
+
+    def run(self, json):
+        """Count the contributors."""
+        return dict(contributors_count=len(json.get('contributors', [])))
+
+
+class StageStats(object):
+    """Duration histogram of a stage."""
+
+    def __init__(self):
+        """Initialize the histogram."""
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.skipped = 0
+
+    def observe(self, duration):
+        """Record the duration of a run."""
+        self.count += 1
+        self.sum += duration
+        for i, bound in enumerate(BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self):
+        """Serialize the histogram."""
+        return dict(
+            count=self.count,
+            sum=self.sum,
+            skipped=self.skipped,
+            buckets=dict(zip((str(b) for b in BUCKETS), self.buckets)),
+        )
+
+
+class IndexerPipeline(object):
+    """Ordered enrichment stages, with per-stage timings."""
+
+    def __init__(self, entry_point_group=None, memo_size=0):
+        """Initialize the pipeline.
+
+        :param entry_point_group: Entry point group of the stages.
+        :param memo_size: Number of stage outputs kept to skip unchanged
+            inputs, ``0`` disables skipping.
+        """
+        self.entry_point_group = entry_point_group
+        self.memo = LRUCache(maxsize=memo_size)
+        self.stats = {}
+        self._stages = None
+
+    @property
+    def stages(self):
+        """Stages, loaded from the entry point group on first access."""
+        if self._stages is None:
+            stages = []
+            if self.entry_point_group:
+                for ep in pkg_resources.iter_entry_points(
+                        group=self.entry_point_group):
+                    stage = ep.load()()
+                    stage.name = stage.name or ep.name
+                    stages.append(stage)
+            self._stages = sorted(stages, key=lambda s: (s.order, s.name))
+            self.stats = {s.name: StageStats() for s in self._stages}
+        return self._stages
+
+    def register(self, stage):
+        """Register a stage programmatically."""
+        stages = self.stages + [stage]
+        self._stages = sorted(stages, key=lambda s: (s.order, s.name))
+        self.stats[stage.name] = StageStats()
+
+    def run(self, json, record=None):
+        """Run all the stages over a dumped record."""
+        for stage in self.stages:
+            started = time.time()
+            key = fingerprint = None
+            if stage.inputs and record is not None and self.memo.maxsize:
+                key = (str(record.id), stage.name)
+                fingerprint = self._fingerprint(json, stage)
+                cached = self.memo.get(key)
+                if cached is not None and cached[0] == fingerprint:
+                    # documents are modified by the following stages
+                    json.update(copy.deepcopy(cached[1]))
+                    self._remove(json, stage.removes)
+                    self.stats[stage.name].skipped += 1
+                    continue
+
+            updates = stage.run(json)
+            if key is not None:
+                self.memo.set(key, (fingerprint, copy.deepcopy(updates)))
+            json.update(updates)
+            self._remove(json, stage.removes)
+            self.stats[stage.name].observe(time.time() - started)
+        return json
+
+    @staticmethod
+    def _remove(json, fields):
+        """Remove fields from the document."""
+        for field in fields:
+            json.pop(field, None)
+
+    @staticmethod
+    def _fingerprint(json, stage):
+        """Hash the values of the input fields and configuration."""
+        values = [json.get(field) for field in stage.inputs] + [
+            current_app.config.get(name) for name in stage.config]
+        return hashlib.sha1(json_dumps(values).encode('utf-8')).hexdigest()
+
+
+def json_dumps(data):
+    """Serialize data in a canonical form."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'),
+                      default=str)
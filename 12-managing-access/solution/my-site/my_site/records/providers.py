@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Record identifier providers reserving identifiers by blocks."""
+
+from __future__ import absolute_import, print_function
+
+import os
+import threading
+from collections import deque
+
+from invenio_db import db
+from invenio_pidstore.models import PIDStatus, RecordIdentifier
+from invenio_pidstore.providers.recordid import RecordIdProvider
+from sqlalchemy import func, select
+
+from .proxies import current_my_site
+
+RECID_SEQUENCE = 'pidstore_recid_recid_seq'
+"""PostgreSQL sequence of the record identifiers."""
+
+
+class IdBlockAllocator(object):
+    """Allocate record identifiers from blocks reserved by the process.
+
+    Blocks are taken from the record identifier sequence, which hands out
+    distinct values to all the processes, and inserted in the record
+    identifier table in a separate transaction, as
+    :meth:`~invenio_pidstore.models.RecordIdentifier.insert` resets the
+    sequence to the largest identifier of the table. Identifiers left in a
+    block when a process stops are never used, leaving gaps. Blocks are only
+    reserved on PostgreSQL, other databases take the identifiers one by one.
+    """
+
+    def __init__(self, block_size=1000):
+        """Initialize the allocator.
+
+        :param block_size: Number of identifiers reserved at once, ``1``
+            disables the reservation.
+        """
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._ids = deque()
+        self._pid = os.getpid()
+
+    def next(self):
+        """Return the next identifier."""
+        return self.take(1)[0]
+
+    def take(self, count):
+        """Return ``count`` identifiers."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked, e.g. by gunicorn or celery: the block is the
+                # parent's one
+                self._ids = deque()
+                self._pid = os.getpid()
+            missing = count - len(self._ids)
+            if missing > 0:
+                self._ids.extend(self._reserve(missing))
+            return [self._ids.popleft() for _ in range(count)]
+
+    def _reserve(self, count):
+        """Reserve at least ``count`` identifiers from the sequence."""
+        if db.engine.name != 'postgresql':
+            return [RecordIdentifier.next() for _ in range(count)]
+        count = max(count, self.block_size)
+        # committed even if the current transaction is rolled back
+        with db.engine.begin() as connection:
+            ids = [
+                value for (value, ) in connection.execute(
+                    select([func.nextval(RECID_SEQUENCE)]).select_from(
+                        func.generate_series(1, count)))
+            ]
+            connection.execute(
+                RecordIdentifier.__table__.insert(),
+                [dict(recid=value) for value in ids])
+        return ids
+
+
+class BlockRecordIdProvider(RecordIdProvider):
+    """Record identifier provider taking identifiers from a block.
+
+    See :class:`IdBlockAllocator` and ``MY_SITE_PID_BLOCK_SIZE``.
+    """
+
+    @classmethod
+    def create(cls, object_type=None, object_uuid=None, **kwargs):
+        """Create a new record identifier."""
+        assert 'pid_value' not in kwargs
+        kwargs['pid_value'] = str(current_my_site.pid_allocator.next())
+        kwargs.setdefault('status', cls.default_status)
+        if object_type and object_uuid:
+            kwargs['status'] = PIDStatus.REGISTERED
+        # skip RecordIdProvider.create, which takes a value from the sequence
+        return super(RecordIdProvider, cls).create(
+            object_type=object_type, object_uuid=object_uuid, **kwargs)
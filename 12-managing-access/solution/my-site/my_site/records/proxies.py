@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Proxies for My site."""
+
+from __future__ import absolute_import, print_function
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+current_my_site = LocalProxy(lambda: current_app.extensions['my-site'])
+"""Proxy to the current My site extension."""
+
+current_author_cache = LocalProxy(lambda: current_my_site.author_cache)
+"""Proxy to the author resolver cache."""
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Search factories."""
+
+from __future__ import absolute_import, print_function
+
+import base64
+import hashlib
+import json
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import arrow
+from flask import abort, current_app, g, request
+from invenio_cache import current_cache
+from invenio_records_rest.errors import SearchPaginationRESTError
+from invenio_records_rest.query import default_search_factory
+from invenio_records_rest.serializers.response import add_link_header
+from invenio_rest.errors import SameContentException
+from invenio_search import current_search_client
+
+from .pipeline import json_dumps
+
+GENERATION_KEY = 'my_site:search_generation'
+"""Cache key of the generation of the indexed documents, the time of the
+last write."""
+
+
+def bump_search_generation():
+    """Invalidate the validators of all the searches.
+
+    Called by the indexer whenever documents are written or deleted, and
+    once the documents written by bulk requests are searchable. See
+    :class:`~my_site.records.indexer.MySiteRecordIndexer`.
+
+    :returns: The new generation.
+    """
+    generation = time.time()
+    current_cache.set(GENERATION_KEY, repr(generation), timeout=0)
+    return generation
+
+
+def search_generation():
+    """Return the generation of the indexed documents, or start one."""
+    generation = current_cache.get(GENERATION_KEY)
+    if generation is None:
+        return bump_search_generation()
+    return float(generation)
+
+
+def search_validator(search):
+    """Compute a validator of the results of a search, without searching.
+
+    The validator is a hash of the search itself, the request URL and
+    accepted media types, and the generation of the indexed documents, which
+    changes whenever any of them is written. Searches have no validator
+    during the ``MY_SITE_SEARCH_REFRESH_INTERVAL`` seconds following a
+    write, which may not be searchable yet.
+
+    :param search: The search, with its filters, pagination and sort.
+    :returns: A ``(etag, last_modified)`` tuple, ``(None, None)`` right
+        after a write.
+    """
+    generation = search_generation()
+    if time.time() - generation < \
+            current_app.config['MY_SITE_SEARCH_REFRESH_INTERVAL']:
+        return None, None
+    params = {
+        k: v for k, v in search._params.items() if k in ('routing', )
+    }
+    key = '\n'.join([
+        json_dumps(search.to_dict()),
+        json_dumps(search._index),
+        json_dumps(params),
+        request.url,
+        request.headers.get('Accept', ''),
+        repr(generation),
+    ])
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return etag, arrow.get(generation).datetime
+
+
+def search_cache_key(etag):
+    """Cache key of the serialized results of a search."""
+    return 'my_site:search:{0}'.format(etag)
+
+
+def cached_search_response(etag, last_modified):
+    """Build the response of a search from the shared cache.
+
+    :returns: The response, or ``None`` if the results are not cached.
+    """
+    if not current_app.config['MY_SITE_SEARCH_CACHE_TIMEOUT']:
+        return None
+    cached = current_cache.get(search_cache_key(etag))
+    if cached is None:
+        return None
+    body, mimetype, links = cached
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    if links is not None:
+        add_link_header(response, links)
+    return response
+
+
+def encode_cursor(pit_id, search_after):
+    """Encode the position of a search in an opaque cursor."""
+    data = json_dumps([pit_id, search_after]).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into a ``(pit_id, search_after)`` tuple."""
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        pit_id, search_after = json.loads(data.decode('utf-8'))
+    except (TypeError, ValueError):
+        raise SearchPaginationRESTError(description='Invalid cursor.')
+    if not isinstance(pit_id, str) or not isinstance(search_after, list):
+        raise SearchPaginationRESTError(description='Invalid cursor.')
+    return pit_id, search_after
+
+
+def cursor_search(search, cursor):
+    """Turn a search into a page of a walk through a point in time.
+
+    Pages follow each other with ``search_after``, sorted by the requested
+    sort and then by ``id``, so that each page costs the same however deep
+    it is. An empty cursor opens a new point in time.
+
+    :param search: The search, with its filters and sort.
+    :param cursor: The cursor of the page, as returned in the ``next`` link
+        of the previous page.
+    :returns: The search of the page.
+    """
+    if request.args.get('page', 1, type=int) != 1 or 'from' in request.args:
+        raise SearchPaginationRESTError(
+            description='Cursors cannot be combined with page or from.')
+    keep_alive = current_app.config['MY_SITE_SEARCH_CURSOR_KEEP_ALIVE']
+    routing = search._params.get('routing')
+    if cursor:
+        pit_id, search_after = decode_cursor(cursor)
+    else:
+        params = dict(routing=routing) if routing else {}
+        pit_id = current_search_client.open_point_in_time(
+            index=search._index, keep_alive=keep_alive, **params)['id']
+        search_after = None
+
+    # the index and routing are those of the point in time
+    search = search.index().sort(*(
+        list(search._sort or ['_score']) + [{'id': 'asc'}]))
+    search._params.pop('routing', None)
+    search._params.pop('preference', None)
+    search = search.extra(pit=dict(id=pit_id, keep_alive=keep_alive))
+    if search_after is not None:
+        search = search.extra(search_after=search_after)
+    g.my_site_search_cursor = dict(
+        pit_id=pit_id, size=search._extra.get('size'))
+    return search
+
+
+def cursor_links(links, search_result):
+    """Replace the page links of a cursor search by cursor links.
+
+    The point in time is closed once the last page is reached.
+
+    :param links: The links of the search result.
+    :param search_result: The search result, as a dictionary.
+    :returns: The links of the search result.
+    """
+    state = getattr(g, 'my_site_search_cursor', None)
+    if state is None or links is None:
+        return links
+    links = {k: v for k, v in links.items() if k == 'self'}
+    hits = search_result['hits']['hits']
+    pit_id = search_result.get('pit_id', state['pit_id'])
+    if hits and len(hits) == state['size']:
+        url = urlsplit(links['self'])
+        args = [(k, v) for k, v in parse_qsl(url.query) if k != 'cursor']
+        args.append(('cursor', encode_cursor(pit_id, hits[-1]['sort'])))
+        links['next'] = urlunsplit(url._replace(query=urlencode(args)))
+    else:
+        current_search_client.close_point_in_time(body=dict(id=pit_id))
+    return links
+
+
+def conditional_search_factory(self, search, query_parser=None):
+    """Search factory answering conditional requests without searching.
+
+    The validator of the search is stored in ``g.my_site_search_validator``
+    for the response serializer. Requests whose ``If-None-Match`` contains
+    it get a 304 response, and results cached under it are sent as is,
+    before any hit is fetched.
+
+    Requests with a ``cursor`` argument are pages of a point in time
+    instead, see :func:`cursor_search`.
+    """
+    search, urlkwargs = default_search_factory(
+        self, search, query_parser=query_parser)
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        urlkwargs['cursor'] = cursor
+        return cursor_search(search, cursor), urlkwargs
+
+    etag, last_modified = search_validator(search)
+    g.my_site_search_validator = (etag, last_modified)
+    if etag:
+        if request.if_none_match.contains(etag):
+            raise SameContentException(etag, last_modified=last_modified)
+        response = cached_search_response(etag, last_modified)
+        if response is not None:
+            abort(response)
+    return search, urlkwargs
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Signal receivers maintaining the author references of the records."""
+
+from __future__ import absolute_import, print_function
+
+from flask import current_app
+from invenio_cache import current_cache
+
+from .indexer import author_refs
+from .jsonresolvers import is_author
+from .models import AuthorReference
+from .tasks import reindex_author_references
+
+
+def create_author_references(sender, record=None, **kwargs):
+    """Index the references of a created record."""
+    if record is None or is_author(record):
+        return
+    AuthorReference.sync(record.id, author_refs(record), created=True)
+
+
+def update_author_references(sender, record=None, **kwargs):
+    """Keep the reverse index of an updated record up to date."""
+    if record is None or is_author(record):
+        return
+    AuthorReference.sync(record.id, author_refs(record))
+
+
+def delete_author_references(sender, record=None, **kwargs):
+    """Drop the references of a deleted record."""
+    if record is None or is_author(record):
+        return
+    AuthorReference.sync(record.id, ())
+
+
+def schedule_author_reindex(sender, record=None, **kwargs):
+    """Reindex the records referencing an updated author.
+
+    Updates are coalesced: only one reindex is scheduled per author within
+    ``MY_SITE_AUTHOR_REINDEX_DEBOUNCE`` seconds, however many times the
+    author is modified meanwhile.
+    """
+    if record is None or not is_author(record) or 'id' not in record:
+        return
+    authid = str(record['id'])
+    debounce = current_app.config['MY_SITE_AUTHOR_REINDEX_DEBOUNCE']
+    key = 'my_site:author_reindex:{0}'.format(authid)
+    if current_cache.add(key, True, timeout=2 * debounce):
+        reindex_author_references.apply_async(
+            args=(authid, ), countdown=debounce)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Partitioned reindexing of records."""
+
+from __future__ import absolute_import, print_function
+
+import json
+import os
+import time
+
+from flask import current_app
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_search import current_search, current_search_client
+from invenio_search.utils import build_alias_name, build_index_name
+from sqlalchemy import func
+
+from .indexer import DUALWRITE_SUFFIX, MySiteRecordIndexer
+
+
+def _pid_query(pid_type, *columns):
+    """Query the registered record PIDs of a type."""
+    return db.session.query(*columns).filter(
+        PersistentIdentifier.pid_type == pid_type,
+        PersistentIdentifier.object_type == 'rec',
+        PersistentIdentifier.status == PIDStatus.REGISTERED,
+    )
+
+
+def pid_ranges(pid_type, range_size):
+    """Split the PIDs of a type in contiguous ranges of primary keys.
+
+    :param pid_type: The PID type, e.g. ``recid``.
+    :param range_size: Width of each range.
+    :returns: A list of inclusive ``(start, end)`` tuples.
+    """
+    low, high = _pid_query(
+        pid_type,
+        func.min(PersistentIdentifier.id),
+        func.max(PersistentIdentifier.id),
+    ).one()
+    if low is None:
+        return []
+    return [
+        (start, min(start + range_size - 1, high))
+        for start in range(low, high + 1, range_size)
+    ]
+
+
+def iter_range(pid_type, start, end, chunk_size=1000):
+    """Stream the record UUIDs of a PID range with a server-side cursor."""
+    query = _pid_query(pid_type, PersistentIdentifier.object_uuid).filter(
+        PersistentIdentifier.id.between(start, end),
+    ).order_by(
+        PersistentIdentifier.id
+    ).execution_options(stream_results=True).yield_per(chunk_size)
+    for (object_uuid, ) in query:
+        yield str(object_uuid)
+
+
+def reindex_range(pid_type, start, end, index=None, indexer=None):
+    """Bulk index the records of a PID range.
+
+    :param index: Index to write to, instead of the one of each record.
+    :returns: A ``(count, elapsed)`` tuple.
+    """
+    indexer = indexer or MySiteRecordIndexer()
+    batch_size = current_app.config['MY_SITE_INDEXER_BATCH_SIZE']
+    started = time.time()
+    count = 0
+    batch = []
+    for record_id in iter_range(pid_type, start, end):
+        batch.append(record_id)
+        if len(batch) >= batch_size:
+            count += indexer.index_batch(batch, index=index)
+            batch = []
+    if batch:
+        count += indexer.index_batch(batch, index=index)
+    indexer.publish()
+    return count, time.time() - started
+
+
+class ReindexState(object):
+    """Completed ranges of a partitioned reindex, persisted to resume it."""
+
+    def __init__(self, path, range_size):
+        """Load the state from ``path`` if it matches the range size."""
+        self.path = path
+        self.range_size = range_size
+        self.completed = {}
+        self.index = None
+        if path and os.path.exists(path):
+            with open(path) as fp:
+                data = json.load(fp)
+            if data.get('range_size') == range_size:
+                self.index = data.get('index')
+                self.completed = {
+                    pid_type: {tuple(r) for r in ranges}
+                    for pid_type, ranges in data['completed'].items()
+                }
+
+    def is_done(self, pid_type, pid_range):
+        """Check if a range was indexed by a previous run."""
+        return tuple(pid_range) in self.completed.get(pid_type, ())
+
+    def done(self, pid_type, pid_range):
+        """Mark a range as indexed and save the state."""
+        self.completed.setdefault(pid_type, set()).add(tuple(pid_range))
+        self.save()
+
+    def save(self):
+        """Save the state."""
+        if not self.path:
+            return
+        tmp_path = '{0}.tmp'.format(self.path)
+        with open(tmp_path, 'w') as fp:
+            json.dump(dict(
+                range_size=self.range_size,
+                index=self.index,
+                completed={
+                    pid_type: sorted(ranges)
+                    for pid_type, ranges in self.completed.items()
+                },
+            ), fp)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget all the completed ranges."""
+        self.completed = {}
+        self.index = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class BlueGreenIndex(object):
+    """New version of a live index, built in the background.
+
+    While the new index is filled, writes to the live index are copied to it
+    through the ``<index>-dualwrite`` alias. Once it caught up, the aliases of
+    the live index are atomically moved to the new one.
+    """
+
+    def __init__(self, alias, index_name, new_index):
+        """Initialize the index.
+
+        :param alias: The search alias, e.g. ``records``.
+        :param index_name: The name of the index mapping, e.g.
+            ``records-record-v1.0.0``.
+        :param new_index: The name of the new concrete index.
+        """
+        self.alias = alias
+        self.index_name = index_name
+        self.new_index = new_index
+        self.write_alias = build_alias_name(index_name)
+        self.dualwrite_alias = self.write_alias + DUALWRITE_SUFFIX
+
+    @classmethod
+    def for_pid_type(cls, pid_type, new_index=None):
+        """Create (or resume) the new index of the records of a PID type."""
+        alias = current_app.config['RECORDS_REST_ENDPOINTS'][pid_type][
+            'search_index']
+        mappings = {
+            name: path
+            for name, path in current_search.aliases[alias].items()
+            if isinstance(path, str)
+        }
+        if len(mappings) != 1:
+            raise ValueError(
+                'Alias {0} does not have a single index.'.format(alias))
+        index_name, mapping_path = mappings.popitem()
+
+        if new_index and current_search_client.indices.exists(new_index):
+            return cls(alias, index_name, new_index)
+
+        new_index = build_index_name(
+            index_name, suffix='-{0}'.format(time.strftime('%Y%m%d%H%M%S')))
+        with open(mapping_path) as fp:
+            body = json.load(fp)
+        current_search_client.indices.create(index=new_index, body=body)
+        return cls(alias, index_name, new_index)
+
+    def start_dualwrite(self):
+        """Copy the writes of the live index to the new one.
+
+        Waits until all the indexers noticed the dual-write alias.
+        """
+        current_search_client.indices.put_alias(
+            index=self.new_index, name=self.dualwrite_alias)
+        time.sleep(
+            current_app.config['MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL'])
+
+    def lag(self):
+        """Number of documents the new index is missing."""
+        client = current_search_client
+        client.indices.refresh(index=[self.write_alias, self.new_index])
+        live = client.count(index=self.write_alias)['count']
+        new = client.count(index=self.new_index)['count']
+        return live - new
+
+    def swap(self):
+        """Atomically move the aliases of the live index to the new one.
+
+        The dual-write alias is removed afterwards, once all the indexers
+        stopped using it.
+
+        :returns: The names of the previously live indices.
+        """
+        client = current_search_client
+        live = list(client.indices.get_alias(name=self.write_alias))
+        actions = []
+        for old_index, data in client.indices.get_alias(index=live).items():
+            for alias in data['aliases']:
+                actions.append(
+                    dict(remove=dict(index=old_index, alias=alias)))
+                actions.append(
+                    dict(add=dict(index=self.new_index, alias=alias)))
+        client.indices.update_aliases(body=dict(actions=actions))
+
+        time.sleep(
+            current_app.config['MY_SITE_INDEXER_DUALWRITE_CHECK_INTERVAL'])
+        client.indices.delete_alias(
+            index=self.new_index, name=self.dualwrite_alias)
+        return live
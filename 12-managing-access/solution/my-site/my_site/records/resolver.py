@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Cached resolution of the persistent identifiers in URLs.
+
+Registered and missing PIDs are cached in process and in the shared cache,
+keyed by ``(pid_type, pid_value)``. Any change of a PID (creation, status
+change, deletion) evicts it, in process when the session is flushed and
+everywhere once it is committed. Other processes may still answer from their
+own cache for ``MY_SITE_PID_CACHE_LOCAL_TTL`` seconds.
+"""
+
+from __future__ import absolute_import, print_function
+
+import uuid
+
+from flask import current_app, request
+from invenio_cache import current_cache
+from invenio_pidstore.errors import PIDDoesNotExistError
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_pidstore.resolver import Resolver
+from invenio_records_rest.utils import PIDConverter
+from sqlalchemy.orm import object_session
+
+MISSING = 'missing'
+"""Cached value of the PIDs which do not exist."""
+
+_CHANGED = 'my_site_changed_pids'
+"""Session info key of the PIDs changed in a transaction."""
+
+
+def pid_cache_key(pid_type, pid_value):
+    """Cache key of a PID."""
+    return 'my_site:pid:{0}:{1}'.format(pid_type, pid_value)
+
+
+def _pid_cache():
+    """In-process PID cache, if the extension is loaded."""
+    ext = current_app.extensions.get('my-site')
+    return ext.pid_cache if ext is not None else None
+
+
+class CachedResolver(Resolver):
+    """Resolver caching the PIDs it looks up.
+
+    Only ``GET`` and ``HEAD`` requests are answered from the cache, the PIDs
+    of any other request are fetched from the database. Cached PIDs are
+    transient objects, not attached to the session.
+    """
+
+    def resolve(self, pid_value):
+        """Resolve a persistent identifier to an internal object.
+
+        :param pid_value: Persistent identifier.
+        :returns: A tuple containing (pid, object).
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return super(CachedResolver, self).resolve(pid_value)
+
+        key = pid_cache_key(self.pid_type, pid_value)
+        local = _pid_cache()
+        entry = local.get(key) if local is not None else None
+        if entry is None:
+            entry = current_cache.get(key)
+            if entry is not None and local is not None:
+                local.set(key, entry)
+
+        if entry == MISSING:
+            raise PIDDoesNotExistError(self.pid_type, pid_value)
+        if entry is not None and entry['object_type'] == self.object_type:
+            pid = PersistentIdentifier(
+                id=entry['id'],
+                pid_type=self.pid_type,
+                pid_value=pid_value,
+                pid_provider=entry['pid_provider'],
+                status=PIDStatus(entry['status']),
+                object_type=entry['object_type'],
+                object_uuid=uuid.UUID(entry['object_uuid']),
+            )
+            return pid, self.object_getter(pid.object_uuid)
+
+        try:
+            pid, obj = super(CachedResolver, self).resolve(pid_value)
+        except PIDDoesNotExistError:
+            self._store(key, MISSING)
+            raise
+        self._store(key, dict(
+            id=pid.id,
+            pid_provider=pid.pid_provider,
+            status=pid.status.value,
+            object_type=pid.object_type,
+            object_uuid=str(pid.object_uuid),
+        ))
+        return pid, obj
+
+    @staticmethod
+    def _store(key, entry):
+        """Cache a resolved PID."""
+        local = _pid_cache()
+        if local is not None:
+            local.set(key, entry)
+        timeout = current_app.config['MY_SITE_PID_CACHE_TIMEOUT']
+        if timeout:
+            current_cache.set(key, entry, timeout=timeout)
+
+
+class CachedPIDConverter(PIDConverter):
+    """PID converter resolving the PIDs with a :class:`CachedResolver`.
+
+    Use ``cached_pid`` as a type in the route pattern instead of ``pid``,
+    e.g. ``/records/<cached_pid(recid):pid_value>``.
+    """
+
+    def __init__(self, url_map, *args, **kwargs):
+        """Initialize the converter."""
+        super(CachedPIDConverter, self).__init__(url_map, *args, **kwargs)
+        self.resolver = CachedResolver(
+            pid_type=self.resolver.pid_type,
+            object_type=self.resolver.object_type,
+            getter=self.resolver.object_getter,
+        )
+
+
+def pid_changed(mapper, connection, target):
+    """Evict a created, updated or deleted PID from the cache.
+
+    It is evicted from the shared cache once the transaction is committed.
+    """
+    local = _pid_cache()
+    if local is not None:
+        local.delete(pid_cache_key(target.pid_type, target.pid_value))
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED, set()).add(
+            (target.pid_type, target.pid_value))
+
+
+def pids_committed(session):
+    """Evict the PIDs changed by a committed transaction."""
+    changed = session.info.pop(_CHANGED, None)
+    if not changed:
+        return
+    keys = [pid_cache_key(*pid) for pid in changed]
+    local = _pid_cache()
+    if local is not None:
+        for key in keys:
+            local.delete(key)
+    current_cache.delete_many(*keys)
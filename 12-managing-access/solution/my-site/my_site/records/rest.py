@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""REST API views of My site records."""
+
+from __future__ import absolute_import, print_function
+
+import json
+from itertools import islice
+
+from flask import Blueprint, Response, current_app, request, \
+    stream_with_context, url_for
+from invenio_db import db
+from invenio_records_rest import current_records_rest
+from invenio_records_rest.links import default_links_factory
+from invenio_records_rest.loaders.marshmallow import MarshmallowErrors
+from invenio_records_rest.utils import allow_all, obj_or_import_string
+from invenio_records_rest.views import verify_record_permission
+
+from ..deposit.api import create_records
+from .api import Record
+from .export import export_records, export_search, export_serializer, \
+    gzip_stream
+
+blueprint = Blueprint(
+    'my_site_records_rest',
+    __name__,
+)
+
+
+@blueprint.route('/records/_export')
+def export():
+    """Stream all the records visible to the user as NDJSON.
+
+    The records are filtered by the search class of the ``recid`` endpoint,
+    with its default permission filter, and serialized like search hits. The
+    body is compressed on the fly when the client accepts gzip.
+    """
+    endpoint = current_app.config['RECORDS_REST_ENDPOINTS']['recid']
+    verify_record_permission(obj_or_import_string(
+        endpoint.get('list_permission_factory_imp'), default=allow_all),
+        None)
+
+    search, pid_fetcher = export_search('recid')
+    if request.args.get('q'):
+        search = search.query('query_string', query=request.args['q'])
+    links_factory = obj_or_import_string(
+        endpoint.get('links_factory_imp'), default=default_links_factory)
+    lines = export_records(search, pid_fetcher, export_serializer('recid'),
+                           links_factory=links_factory)
+
+    headers = {}
+    if 'gzip' in request.accept_encodings:
+        lines = gzip_stream(lines)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(lines), headers=headers,
+                    mimetype='application/x-ndjson')
+
+
+def _load_lines(lines, loader, permission_factory):
+    """Load the lines of a bulk request.
+
+    :returns: A list of ``(line, data, error)`` tuples, ``data`` being
+        ``None`` for the lines which cannot be created.
+    """
+    loaded = []
+    for number, line in lines:
+        try:
+            data = loader(data=json.loads(line.decode('utf-8')))
+        except ValueError:
+            loaded.append((number, None, dict(
+                status=400, message='Invalid JSON.')))
+            continue
+        except MarshmallowErrors as e:
+            loaded.append((number, None, dict(
+                status=400, message=e.description, errors=e.errors)))
+            continue
+        if permission_factory and \
+                not permission_factory(record=data).can():
+            loaded.append((number, None, dict(
+                status=403, message='Permission denied.')))
+            continue
+        loaded.append((number, data, None))
+    return loaded
+
+
+def bulk_create(pid_type):
+    """Create the records of a newline-delimited JSON body.
+
+    Lines are read from the request as they arrive, and created in
+    transactions of ``MY_SITE_BULK_BATCH_SIZE`` records, each line going
+    through the JSON loader and the create permission of the endpoint. The
+    result of each line is streamed back as a line of JSON, with its line
+    number. If a transaction fails, it is rolled back and a single line
+    reports the numbers of the lines of the batch.
+
+    :param pid_type: The PID type of the ``RECORDS_REST_ENDPOINTS`` entry.
+    """
+    endpoint = current_app.config['RECORDS_REST_ENDPOINTS'][pid_type]
+    permission_factory = obj_or_import_string(
+        endpoint.get('create_permission_factory_imp'))
+    if permission_factory:
+        verify_record_permission(permission_factory, None)
+    loader = obj_or_import_string(
+        endpoint['record_loaders']['application/json'])
+    record_class = obj_or_import_string(
+        endpoint.get('record_class'), default=Record)
+    batch_size = current_app.config['MY_SITE_BULK_BATCH_SIZE']
+    pid_field = current_app.config['PIDSTORE_RECID_FIELD']
+    item_endpoint = 'invenio_records_rest.{0}_item'.format(
+        current_records_rest.default_endpoint_prefixes[pid_type])
+
+    def results():
+        lines = (
+            (number, line)
+            for number, line in enumerate(
+                iter(request.stream.readline, b''), 1)
+            if line.strip()
+        )
+        while True:
+            batch = _load_lines(
+                islice(lines, batch_size), loader, permission_factory)
+            if not batch:
+                break
+            loaded = [number for number, data, _ in batch if data is not None]
+            try:
+                created = iter(list(create_records(
+                    (data for _, data, _ in batch if data is not None),
+                    batch_size=batch_size, record_class=record_class,
+                    pid_type=pid_type)))
+            except Exception:
+                db.session.rollback()
+                current_app.logger.exception('Bulk creation failed.')
+                yield json.dumps(dict(
+                    status=500, message='The batch could not be created.',
+                    lines=loaded)) + '\n'
+                batch = [entry for entry in batch if entry[1] is None]
+            for number, data, result in batch:
+                if data is not None:
+                    record, error = next(created)
+                    if error is None:
+                        pid_value = record[pid_field]
+                        result = dict(status=201, id=pid_value, links=dict(
+                            self=url_for(item_endpoint, pid_value=pid_value,
+                                         _external=True)))
+                    else:
+                        result = dict(status=400, message=str(
+                            getattr(error, 'message', error)))
+                result['line'] = number
+                yield json.dumps(result) + '\n'
+
+    return Response(stream_with_context(results()),
+                    mimetype='application/x-ndjson')
+
+
+@blueprint.route('/records/_bulk', methods=['POST'])
+def bulk_records():
+    """Create records from newline-delimited JSON."""
+    return bulk_create('recid')
+
+
+@blueprint.route('/authors/_bulk', methods=['POST'])
+def bulk_authors():
+    """Create authors from newline-delimited JSON."""
+    return bulk_create('authid')
@@ -1,10 +1,18 @@
 from elasticsearch_dsl import Q
+from flask import current_app, g
 from flask_security import current_user
 from invenio_search.api import DefaultFilter, RecordsSearch
 
+from .permissions import identity_access_needs
+
 
 def owner_permission_filter():
     """Search filter with permission."""
+    if current_app.config['MY_SITE_RECORDS_OWNER_ROUTING']:
+        if not current_user.is_authenticated:
+            return [Q('match_none')]
+        # exact, non-scoring and cacheable
+        return [Q('term', owner=int(current_user.get_id()))]
     return [Q('match', owner=current_user.get_id())]
 
 
@@ -15,3 +23,35 @@ class OwnerRecordsSearch(RecordsSearch):
         index = 'records'
         default_filter = DefaultFilter(owner_permission_filter)
         doc_types = None
+
+    def __init__(self, **kwargs):
+        """Search only the shard of the current user, if routing by owner."""
+        super(OwnerRecordsSearch, self).__init__(**kwargs)
+        if current_app.config['MY_SITE_RECORDS_OWNER_ROUTING'] and \
+                current_user.is_authenticated:
+            self._params.setdefault('routing', str(current_user.get_id()))
+
+
+def access_permission_filter():
+    """Search filter matching the needs of the identity to the records."""
+    needs = identity_access_needs(g.identity)
+    if not needs:
+        return [Q('match_none')]
+    return [Q('terms', **{'_access.read': needs})]
+
+
+class AccessRecordsSearch(OwnerRecordsSearch):
+    """Class providing the search filter of the indexed read access."""
+
+    class Meta:
+        index = 'records'
+        default_filter = DefaultFilter(access_permission_filter)
+        doc_types = None
+
+    def __init__(self, **kwargs):
+        """Only route by owner if no role grants access to other records."""
+        super(AccessRecordsSearch, self).__init__(**kwargs)
+        roles = set(current_app.config['MY_SITE_RECORDS_READ_ROLES'])
+        if roles and any(need.method == 'role' and need.value in roles
+                         for need in g.identity.provides):
+            self._params.pop('routing', None)
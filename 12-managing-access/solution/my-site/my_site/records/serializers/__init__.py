@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Record serializers."""
+
+from __future__ import absolute_import, print_function
+
+from ..marshmallow import RecordSchemaV1
+from .json import JSONSerializer
+from .response import cached_record_responsify, \
+    conditional_search_responsify
+
+# Serializers
+# ===========
+#: JSON serializer definition.
+json_v1 = JSONSerializer(RecordSchemaV1, replace_refs=True)
+
+# Records-REST serializers
+# ========================
+#: JSON record serializer for individual records.
+json_v1_response = cached_record_responsify(json_v1, 'application/json')
+#: JSON record serializer for search results.
+json_v1_search = conditional_search_responsify(json_v1, 'application/json')
+
+__all__ = (
+    'json_v1',
+    'json_v1_response',
+    'json_v1_search',
+)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""JSON serializer dumping records with compiled schemas."""
+
+from __future__ import absolute_import, print_function
+
+from flask import current_app
+from invenio_records_rest.serializers.json import \
+    JSONSerializer as _JSONSerializer
+from marshmallow import ValidationError
+
+from ..indexer import author_refs
+from ..marshmallow.dumper import UnsupportedSchema, compile_dumper
+from ..proxies import current_author_cache
+
+
+class JSONSerializer(_JSONSerializer):
+    """Marshmallow based JSON serializer, with a compiled dump path.
+
+    The schema is compiled on first use with
+    :func:`~my_site.records.marshmallow.dumper.compile_dumper`. Schemas which
+    cannot be compiled, and values the compiled functions cannot serialize
+    (e.g. an invalid email), are dumped with marshmallow.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the serializer."""
+        super(JSONSerializer, self).__init__(*args, **kwargs)
+        self._dumper = None
+
+    @property
+    def dumper(self):
+        """Compiled dump function of the schema, or ``False``."""
+        if self._dumper is None:
+            try:
+                self._dumper = compile_dumper(self.schema_class)
+            except UnsupportedSchema:
+                self._dumper = False
+        return self._dumper
+
+    def preprocess_record(self, pid, record, links_factory=None, **kwargs):
+        """Prepare a record, resolving the authors it references at once."""
+        if self.replace_refs:
+            current_author_cache.prefetch(author_refs(record))
+        return super(JSONSerializer, self).preprocess_record(
+            pid, record, links_factory=links_factory, **kwargs)
+
+    def dump(self, obj, context=None):
+        """Serialize object with the compiled schema."""
+        if self.dumper:
+            try:
+                return self.dumper(obj, context or {})
+            except (TypeError, ValueError, ValidationError):
+                # invalid values fail the inlined conversions, marshmallow
+                # reports them instead
+                current_app.logger.warning(
+                    'Compiled dump of %s failed, dumping it with marshmallow.',
+                    self.schema_class.__name__, exc_info=True)
+        return super(JSONSerializer, self).dump(obj, context=context)
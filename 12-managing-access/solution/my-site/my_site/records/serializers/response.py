@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Cached response factories."""
+
+from __future__ import absolute_import, print_function
+
+import hashlib
+import re
+
+from flask import current_app, g, request
+from invenio_cache import current_cache
+from invenio_records_rest.serializers.response import add_link_header
+from invenio_rest.errors import SameContentException
+
+from ..indexer import author_refs
+from ..proxies import current_author_cache, current_my_site
+from ..query import cursor_links, search_cache_key
+
+RECORD_ETAG_RE = re.compile(r'"(\d+)\.[0-9a-f]+"')
+"""Entity tag of a record, see :func:`record_etag`."""
+
+
+def response_cache_key(pid, record, mimetype):
+    """Cache key of a serialized record.
+
+    It changes with the revision of the record and of the authors it
+    references, and with anything else the serialization depends on. The
+    revisions of the authors are only looked up for the records referencing
+    some, with a single query.
+    """
+    revisions = current_author_cache.revisions(author_refs(record))
+    key = '\n'.join([
+        pid.pid_type,
+        str(pid.pid_value),
+        str(record.revision_id),
+        mimetype,
+        request.url_root,
+        '1' if request.args.get('prettyprint') else '',
+        ','.join('{0}:{1}'.format(*item) for item in sorted(
+            revisions.items())),
+    ])
+    return 'my_site:response:{0}'.format(
+        hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+def record_etag(record, key):
+    """Entity tag of a serialized record.
+
+    It is the revision of the record followed by a digest of its cache key,
+    so that it changes with the authors the record references, see
+    :func:`response_cache_key`.
+    """
+    return '{0}.{1}'.format(record.revision_id, key.rsplit(':', 1)[-1][:16])
+
+
+def record_if_match():
+    """Only keep the revision of the record tags of ``If-Match`` on writes.
+
+    invenio-records-rest compares it to the revision of the record, while
+    the referenced authors do not matter to a write, see :func:`record_etag`.
+    """
+    if request.method not in ('PUT', 'PATCH', 'DELETE'):
+        return
+    header = request.environ.get('HTTP_IF_MATCH')
+    if header:
+        request.environ['HTTP_IF_MATCH'] = RECORD_ETAG_RE.sub(r'"\1"', header)
+
+
+def cached_record_responsify(serializer, mimetype):
+    """Create a Records-REST response serializer caching the responses.
+
+    Serialized records are cached in process and in the shared cache for
+    ``MY_SITE_RESPONSE_CACHE_TIMEOUT`` seconds, see
+    :func:`response_cache_key`. The entity tag is derived from the same key,
+    see :func:`record_etag`: conditional reads are answered with ``304``
+    before looking the body up.
+
+    :param serializer: Serializer instance.
+    :param mimetype: MIME type of response.
+    :returns: Function that generates a record HTTP response.
+    """
+    def view(pid, record, code=200, headers=None, links_factory=None):
+        key = response_cache_key(pid, record, mimetype)
+        etag = record_etag(record, key)
+        if request.method in ('GET', 'HEAD') and \
+                request.if_none_match.contains(etag):
+            raise SameContentException(etag)
+        body = current_my_site.response_cache.get(key)
+        if body is None:
+            timeout = current_app.config['MY_SITE_RESPONSE_CACHE_TIMEOUT']
+            body = current_cache.get(key) if timeout else None
+            if body is None:
+                body = serializer.serialize(
+                    pid, record, links_factory=links_factory)
+                if timeout:
+                    current_cache.set(key, body, timeout=timeout)
+            current_my_site.response_cache.set(key, body)
+
+        response = current_app.response_class(body, mimetype=mimetype)
+        response.status_code = code
+        response.set_etag(etag)
+        response.last_modified = record.updated
+        response.vary.add('Accept')
+        if headers is not None:
+            response.headers.extend(headers)
+
+        if links_factory is not None:
+            add_link_header(response, links_factory(pid))
+
+        return response
+
+    view.serializer = serializer
+    return view
+
+
+def conditional_search_responsify(serializer, mimetype):
+    """Create a Records-REST search result response serializer with ETags.
+
+    The validator computed by
+    :func:`~my_site.records.query.conditional_search_factory` is sent as
+    entity tag, and the serialized results are kept in the shared cache
+    for ``MY_SITE_SEARCH_CACHE_TIMEOUT`` seconds, keyed by it, for the search
+    factory to send them again.
+
+    :param serializer: Serializer instance.
+    :param mimetype: MIME type of response.
+    :returns: Function that generates a record HTTP response.
+    """
+    def view(pid_fetcher, search_result, code=200, headers=None, links=None,
+             item_links_factory=None):
+        links = cursor_links(links, search_result)
+        etag, last_modified = getattr(
+            g, 'my_site_search_validator', (None, None))
+        body = serializer.serialize_search(
+            pid_fetcher, search_result, links=links,
+            item_links_factory=item_links_factory)
+        timeout = current_app.config['MY_SITE_SEARCH_CACHE_TIMEOUT']
+        if etag and timeout:
+            current_cache.set(search_cache_key(etag),
+                              (body, mimetype, links), timeout=timeout)
+
+        response = current_app.response_class(body, mimetype=mimetype)
+        response.status_code = code
+        if etag:
+            response.set_etag(etag)
+            response.last_modified = last_modified
+        if headers is not None:
+            response.headers.extend(headers)
+
+        if links is not None:
+            add_link_header(response, links)
+
+        return response
+
+    view.serializer = serializer
+    return view
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Signals of My site records."""
+
+from __future__ import absolute_import, print_function
+
+from blinker import Namespace
+
+_signals = Namespace()
+
+record_indexed = _signals.signal('record-indexed')
+"""Signal sent once a record was written to its index.
+
+Unlike :data:`invenio_indexer.signals.before_record_index`, it is only sent
+if Elasticsearch acknowledged the write. The sender is the current
+application, and the keyword arguments are ``record_id``, the UUID of the
+record as a string, and ``json``, the indexed document.
+"""
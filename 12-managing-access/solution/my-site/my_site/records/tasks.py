@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Celery tasks."""
+
+from __future__ import absolute_import, print_function
+
+from celery import shared_task
+from invenio_cache import current_cache
+
+from . import reindex
+from .indexer import MySiteRecordIndexer
+from .models import AuthorReference
+
+
+@shared_task(ignore_result=True)
+def process_bulk_queue(version_type=None, es_bulk_kwargs=None):
+    """Process the bulk indexing queue, resolving authors in batches.
+
+    :param str version_type: Elasticsearch version type.
+    :param dict es_bulk_kwargs: Passed to
+        :func:`elasticsearch:elasticsearch.helpers.bulk`.
+    """
+    MySiteRecordIndexer(version_type=version_type).process_bulk_queue(
+        es_bulk_kwargs=es_bulk_kwargs)
+
+
+@shared_task
+def reindex_range(pid_type, start, end, index=None):
+    """Bulk index the records of a range of PIDs.
+
+    :param index: Index to write to, instead of the one of each record.
+    :returns: A ``(count, elapsed)`` tuple.
+    """
+    return reindex.reindex_range(pid_type, start, end, index=index)
+
+
+@shared_task(ignore_result=True)
+def reindex_author_references(authid):
+    """Queue for bulk indexing the records referencing an author.
+
+    The validators of the searches are invalidated once the queue is
+    processed, see :meth:`.indexer.MySiteRecordIndexer.publish`.
+    """
+    # updates of the author from now on schedule a new reindex
+    current_cache.delete('my_site:author_reindex:{0}'.format(authid))
+    MySiteRecordIndexer().bulk_index(AuthorReference.record_ids(authid))
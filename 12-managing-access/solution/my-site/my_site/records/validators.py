@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2019 CERN.
+#
+# My site is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Cached JSON Schema validators.
+
+Invenio-Records resolves the ``$schema`` of a record and builds a validator
+each time the record is validated. The registry does it once per
+schema and process: the resolved schemas, and the documents they reference,
+are kept by URL, and each thread keeps its validator instances, which are
+not thread-safe. Errors are reported like :func:`jsonschema.validate` does,
+with the best matching one.
+"""
+
+from __future__ import absolute_import, print_function
+
+import threading
+
+from flask import current_app
+from invenio_jsonschemas import current_jsonschemas
+from invenio_records.api import _records_state
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+
+class ValidatedData(dict):
+    """Record data some fields of which are known to be valid.
+
+    Loaders return it for the fields their schema validates at least as
+    strictly as the JSON Schema of the records, so that
+    :meth:`CachedValidationMixin.create` does not validate them again.
+
+    :param data: The loaded data.
+    :param validated_fields: The validated top-level fields.
+    """
+
+    def __init__(self, data, validated_fields=()):
+        """Initialize the data."""
+        super(ValidatedData, self).__init__(data)
+        self.validated_fields = frozenset(validated_fields) & frozenset(self)
+
+
+def partial_schema(schema, fields):
+    """Schema accepting any value for some top-level properties.
+
+    Whether they are allowed and required is still checked.
+
+    :param schema: A resolved JSON Schema.
+    :param fields: The properties whose values are not validated.
+    """
+    properties = dict(schema.get('properties', {}))
+    for field in fields:
+        if field in properties:
+            properties[field] = {}
+    return dict(schema, properties=properties)
+
+
+class ValidatorRegistry(object):
+    """Validators of the record schemas, by ``$schema`` URL."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._schemas = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def schema(self, url):
+        """Resolve a schema, with the documents it references.
+
+        :param url: The URL of the schema.
+        :returns: A ``(schema, store)`` tuple, the store holding the
+            referenced documents by URL.
+        """
+        entry = self._schemas.get(url)
+        if entry is None:
+            with self._lock:
+                entry = self._schemas.get(url)
+                if entry is None:
+                    resolver = _records_state.ref_resolver_cls.from_schema(
+                        {'$ref': url})
+                    schema = resolver.resolve(url)[1]
+                    entry = self._schemas[url] = (schema, resolver.store)
+        return entry
+
+    def validator(self, url, format_checker=None, cls=None,
+                  validated_fields=frozenset()):
+        """Return the validator of a schema for the current thread.
+
+        :param url: The URL of the schema.
+        :param format_checker: A :class:`jsonschema.FormatChecker`.
+        :param cls: The validator class, defaults to the one
+            :func:`jsonschema.validate` picks for the ``$schema`` reference.
+        :param validated_fields: Top-level fields whose values are not
+            validated, see :func:`partial_schema`.
+        """
+        validators = getattr(self._local, 'validators', None)
+        if validators is None:
+            validators = self._local.validators = {}
+        key = (url, format_checker, cls, validated_fields)
+        validator = validators.get(key)
+        if validator is None:
+            schema, store = self.schema(url)
+            cls = cls or validator_for({'$ref': url})
+            if validated_fields:
+                schema = partial_schema(schema, validated_fields)
+            kwargs = {}
+            types = current_app.config.get('RECORDS_VALIDATION_TYPES')
+            if types:
+                kwargs['types'] = types
+            validator = validators[key] = cls(
+                schema,
+                resolver=_records_state.ref_resolver_cls.from_schema(
+                    schema, store=store),
+                format_checker=format_checker,
+                **kwargs
+            )
+        return validator
+
+    def validate(self, data, url, format_checker=None, cls=None,
+                 validated_fields=frozenset()):
+        """Validate data against a schema.
+
+        :raises jsonschema.exceptions.ValidationError: If the data is not
+            valid.
+        """
+        validator = self.validator(
+            url, format_checker=format_checker, cls=cls,
+            validated_fields=frozenset(validated_fields))
+        error = best_match(validator.iter_errors(data))
+        if error is not None:
+            raise error
+
+    def warm(self, urls):
+        """Resolve schemas ahead of their first use."""
+        for url in urls:
+            self.schema(url)
+
+
+def warm_validators(app):
+    """Resolve the schemas of ``MY_SITE_VALIDATORS_WARM`` before forking."""
+    with app.app_context():
+        app.extensions['my-site'].validators.warm(
+            current_jsonschemas.path_to_url(path)
+            for path in app.config['MY_SITE_VALIDATORS_WARM'])
+
+
+class CachedValidationMixin(object):
+    """Validate records with the validators of the registry."""
+
+    @classmethod
+    def create(cls, data, id_=None, **kwargs):
+        """Create a record, not validating again the loaded fields.
+
+        See :meth:`invenio_records.api.Record.create`.
+        """
+        if isinstance(data, ValidatedData) and data.validated_fields:
+            kwargs.setdefault('validated_fields', data.validated_fields)
+        return super(CachedValidationMixin, cls).create(
+            data, id_=id_, **kwargs)
+
+    def validate(self, format_checker=None, validator=None,
+                 validated_fields=frozenset(), **kwargs):
+        """Validate record according to schema defined in ``$schema`` key.
+
+        See :meth:`invenio_records.api.RecordBase.validate`.
+
+        :param validated_fields: Top-level fields whose values are known to
+            be valid, and are not validated again.
+        """
+        if kwargs:
+            return super(CachedValidationMixin, self).validate(
+                format_checker=format_checker, validator=validator, **kwargs)
+        if '$schema' in self and self['$schema'] is not None:
+            current_app.extensions['my-site'].validators.validate(
+                self, self['$schema'], format_checker=format_checker,
+                cls=validator, validated_fields=validated_fields)
@@ -39,8 +39,14 @@ setup(
         'console_scripts': [
             'my-site = invenio_app.cli:cli',
         ],
+        'flask.commands': [
+            'index = my_site.records.cli:index',
+            'deposit = my_site.deposit.cli:deposit',
+            'records = my_site.records.cli:records',
+        ],
         'invenio_base.apps': [
             'my_site_records = my_site.records:Mysite',
+            'my_site_authors = my_site.authors:Authors',
         ],
         'invenio_base.blueprints': [
             'my_site = my_site.theme.views:blueprint',
@@ -60,11 +66,21 @@ setup(
             'my_site = my_site.records:Mysite',
             'authors = my_site.authors:Authors',
         ],
+        'invenio_base.api_blueprints': [
+            'my_site_records = my_site.records.rest:blueprint',
+        ],
+        'invenio_base.finalize_app': [
+            'my_site = my_site.records.validators:warm_validators',
+        ],
+        'invenio_base.api_finalize_app': [
+            'my_site = my_site.records.validators:warm_validators',
+        ],
         'invenio_pidstore.fetchers': [
             'authid = my_site.authors.fetchers:author_pid_fetcher',
         ],
         'invenio_pidstore.minters': [
             'authid = my_site.authors.minters:author_pid_minter',
+            'my_site_recid = my_site.records.minters:recid_minter',
         ],
         'invenio_jsonschemas.schemas': [
             'my_site = my_site.records.jsonschemas',
@@ -73,6 +89,18 @@ setup(
         "invenio_records.jsonresolver": [
             "author = my_site.records.jsonresolvers",
         ],
+        'invenio_db.models': [
+            'my_site_records = my_site.records.models',
+        ],
+        'invenio_celery.tasks': [
+            'my_site_records = my_site.records.tasks',
+            'my_site_authors = my_site.authors.tasks',
+        ],
+        'my_site.records.indexer_stages': [
+            'read_access = my_site.records.pipeline:ReadAccess',
+            'keywords = my_site.records.pipeline:RemoveKeywords',
+            'contributors_count = my_site.records.pipeline:ContributorsCount',
+        ],
         'invenio_search.mappings': [
             'records = my_site.records.mappings',
             'authors = my_site.authors.mappings',
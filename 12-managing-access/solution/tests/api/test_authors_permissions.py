@@ -0,0 +1,97 @@
+"""Test of the local view of the indexed authors."""
+
+import time
+import uuid
+
+import pytest
+from flask import Flask
+
+from my_site.authors.ext import Authors
+from my_site.authors.permissions import BloomFilter, IndexedAuthors, \
+    author_indexed_receiver, indexed_author_permission
+
+
+class Author(object):
+    """Author record stub, with a UUID."""
+
+    def __init__(self):
+        """Initialize the author."""
+        self.id = uuid.uuid4()
+
+
+@pytest.fixture()
+def app():
+    """Application with a loaded view of the indexed authors."""
+    app = Flask('testapp')
+    ext = Authors()
+    ext.indexed_authors = IndexedAuthors('authors')
+    app.extensions['my-site-authors'] = ext
+    with app.app_context():
+        yield app
+
+
+def test_bloom_filter_membership():
+    """Added keys are found, and few others are."""
+    added = [str(uuid.uuid4()) for _ in range(1000)]
+    bloom = BloomFilter(len(added), error_rate=0.01)
+    for key in added:
+        bloom.add(key)
+
+    assert all(key in bloom for key in added)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_empty():
+    """Nothing is found in an empty filter."""
+    bloom = BloomFilter(0)
+    assert str(uuid.uuid4()) not in bloom
+
+
+def test_indexed_author_permission(app):
+    """Indexed authors can be read, deleted ones cannot."""
+    indexed_authors = app.extensions['my-site-authors'].indexed_authors
+    loaded, indexed, deleted = Author(), Author(), Author()
+    bloom = BloomFilter(10)
+    bloom.add(str(loaded.id))
+    bloom.add(str(deleted.id))
+    indexed_authors.bloom, indexed_authors.checked = bloom, time.time()
+    indexed_authors.indexed(indexed.id)
+    indexed_authors.deleted(deleted.id)
+
+    assert indexed_author_permission(loaded).can()
+    assert indexed_author_permission(indexed).can()
+    assert not indexed_author_permission(deleted).can()
+
+
+def test_author_indexed_receiver(app):
+    """Only the written authors are added to the view."""
+    indexed_authors = app.extensions['my-site-authors'].indexed_authors
+    author, record = Author(), Author()
+    author_indexed_receiver(
+        app, record_id=str(author.id),
+        json={'$schema': 'https://my-site.com/schemas/authors/'
+                         'author-v1.0.0.json'})
+    author_indexed_receiver(
+        app, record_id=str(record.id),
+        json={'$schema': 'https://my-site.com/schemas/records/'
+                         'record-v1.0.0.json'})
+
+    assert indexed_authors.cache.get(str(author.id)) is True
+    assert indexed_authors.cache.get(str(record.id)) is None
+
+
+def test_deleted_author_expires(app, monkeypatch):
+    """Deleted authors are only cached for a few seconds."""
+    indexed_authors = app.extensions['my-site-authors'].indexed_authors
+    author = Author()
+    bloom = BloomFilter(10)
+    bloom.add(str(author.id))
+    indexed_authors.bloom, indexed_authors.checked = bloom, time.time()
+    indexed_authors.deleted(author.id)
+    assert not indexed_authors.exists(author.id)
+
+    now = time.time() + 6
+    monkeypatch.setattr(time, 'time', lambda: now)
+    indexed_authors.checked = now
+    assert indexed_authors.exists(author.id)
@@ -0,0 +1,74 @@
+"""Test of the compiled record serializers."""
+
+import pytest
+from marshmallow import __version_info__ as marshmallow_version
+
+from my_site.authors.marshmallow import AuthorSchemaV1
+from my_site.records.marshmallow.dumper import compile_dumper
+from my_site.records.marshmallow.json import RecordSchemaV1
+
+
+class PID(object):
+    """Persistent identifier stub, as put in the marshmallow context."""
+
+    pid_value = '1'
+
+
+RECORDS = [
+    dict(
+        id='1',
+        metadata=dict(
+            id='1',
+            title='A record',
+            keywords=['physics', 'cern'],
+            publication_date='2019-04-01',
+            owner=3,
+            contributors=[
+                dict(
+                    name='Doe, John',
+                    ids=[dict(source='orcid', value='0000-0002-1825-0097')],
+                    role='Author',
+                    affiliations=['CERN'],
+                    email='john.doe@cern.ch',
+                ),
+                dict(name='Doe, Jane'),
+            ],
+        ),
+        links=dict(self='https://localhost/api/records/1'),
+        revision=2,
+        created='2019-04-01T10:00:00',
+        updated='2019-04-02T10:00:00',
+    ),
+    dict(metadata=dict(title=None, keywords='single', contributors=None)),
+    dict(metadata=dict(title=3, owner='7', publication_date='not a date')),
+    dict(metadata=dict(contributors=[dict(name='X', affiliations=None)])),
+    dict(),
+]
+
+AUTHORS = [
+    dict(
+        id='1',
+        metadata=dict(id='1', name='Doe, John', organization='CERN'),
+        created='2019-04-01T10:00:00',
+        updated='2019-04-02T10:00:00',
+    ),
+    dict(metadata=dict(name=None)),
+]
+
+
+def marshmallow_dump(schema_class, obj, context):
+    """Dump with marshmallow."""
+    result = schema_class(context=context).dump(obj)
+    return result.data if marshmallow_version[0] < 3 else result
+
+
+@pytest.mark.parametrize('schema_class,obj', [
+    (RecordSchemaV1, record) for record in RECORDS
+] + [
+    (AuthorSchemaV1, author) for author in AUTHORS
+])
+def test_compiled_dumper_parity(schema_class, obj):
+    """Test that compiled schemas dump the same data as marshmallow."""
+    context = dict(pid=PID())
+    dump = compile_dumper(schema_class)
+    assert dump(obj, context) == marshmallow_dump(schema_class, obj, context)
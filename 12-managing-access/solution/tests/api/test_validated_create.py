@@ -0,0 +1,90 @@
+"""Test of the creation of records validated by the REST loader."""
+
+import pytest
+from flask import Flask
+from invenio_db import InvenioDB, db
+from invenio_jsonschemas import InvenioJSONSchemas
+from invenio_records import InvenioRecords
+from invenio_records_rest.loaders.marshmallow import MarshmallowErrors
+from jsonschema.exceptions import ValidationError
+
+from my_site.records.api import Record
+from my_site.records.ext import Mysite
+from my_site.records.loaders import json_v1
+from my_site.records.validators import ValidatedData
+
+CONTRIBUTOR = dict(name='Doe, John')
+
+
+@pytest.fixture()
+def app():
+    """Application with a database and the single-pass validation."""
+    app = Flask('testapp')
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        JSONSCHEMAS_HOST='my-site.com',
+        MY_SITE_SINGLE_PASS_VALIDATION=True,
+    )
+    InvenioDB(app)
+    InvenioJSONSchemas(app)
+    InvenioRecords(app)
+    Mysite(app)
+    app.add_url_rule('/records/', 'records', lambda: '', methods=['POST'])
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def load(app, payload):
+    """Load a payload with the REST loader of the records."""
+    with app.test_request_context('/records/', method='POST'):
+        data = json_v1(data=payload)
+    # the identifier set by the minter
+    data['id'] = '1'
+    return data
+
+
+def test_loaded_fields_not_validated_again(app):
+    """Only the fields not validated by the loader are validated."""
+    data = load(app, dict(title='A record', contributors=[CONTRIBUTOR]))
+    assert isinstance(data, ValidatedData)
+    assert data.validated_fields == {'title', 'contributors'}
+
+    # values of the validated fields are trusted, even if wrong
+    data['contributors'] = []
+    record = Record.create(data)
+    assert record['$schema'].endswith('records/record-v1.0.0.json')
+    registry = app.extensions['my-site'].validators
+    assert registry.validator(
+        record['$schema'], validated_fields=data.validated_fields) is \
+        registry.validator(
+            record['$schema'], validated_fields=data.validated_fields)
+
+    # updates are fully validated
+    with pytest.raises(ValidationError):
+        record.commit()
+
+
+def test_invalid_data_rejected(app):
+    """Invalid payloads are rejected by the loader or the JSON Schema."""
+    with pytest.raises(MarshmallowErrors):
+        load(app, dict(title='A record', contributors=[]))
+
+    data = load(app, dict(title='A record', contributors=[CONTRIBUTOR]))
+    data['author'] = {}
+    with pytest.raises(ValidationError):
+        Record.create(data)
+
+
+def test_single_pass_disabled(app):
+    """Without single-pass, created records are fully validated."""
+    app.config['MY_SITE_SINGLE_PASS_VALIDATION'] = False
+    data = load(app, dict(title='A record', contributors=[CONTRIBUTOR]))
+    assert not isinstance(data, ValidatedData)
+
+    data['contributors'] = []
+    with pytest.raises(ValidationError):
+        Record.create(data)
@@ -0,0 +1,134 @@
+"""Test of the single-pass validation of the REST loaders."""
+
+import json
+import os
+
+import pytest
+from flask import Flask
+from jsonschema.validators import validator_for
+from marshmallow import ValidationError
+from marshmallow import __version_info__ as marshmallow_version
+
+import my_site.records
+from my_site.records.loaders import VALIDATED_FIELDS
+from my_site.records.marshmallow import MetadataSchemaV1
+from my_site.records.validators import partial_schema
+
+SCHEMA_PATH = os.path.join(
+    os.path.dirname(my_site.records.__file__),
+    'jsonschemas', 'records', 'record-v1.0.0.json')
+
+CONTRIBUTOR = dict(name='Doe, John')
+
+PAYLOADS = [
+    (dict(title='A record', contributors=[CONTRIBUTOR]), True),
+    (dict(
+        title='A record',
+        keywords=['physics', 'cern'],
+        owner='3',
+        contributors=[
+            dict(
+                name='Doe, John',
+                ids=[
+                    dict(source='orcid', value='0000-0002-1825-0097'),
+                    dict(source='cds', value='1'),
+                ],
+                role='Researcher',
+                affiliations=['CERN', 'EPFL'],
+            ),
+            dict(name='Roe, Jane', role='ContactPerson'),
+        ],
+    ), True),
+    (dict(title='A record', contributors=[]), False),
+    (dict(title='A record'), False),
+    (dict(title='A record', contributors=[dict(role='Other')]), False),
+    (dict(title='A record', contributors=[
+        dict(name='Doe, John', role='Author')]), False),
+    (dict(title='A record', contributors=[
+        dict(name='Doe, John', ids=[
+            dict(source='orcid', value='1'),
+            dict(source='orcid', value='1'),
+        ])]), False),
+    (dict(title='A record', contributors=[
+        dict(name='Doe, John', affiliations=['CERN', 'CERN'])]), False),
+    (dict(title='A record', contributors=[
+        dict(name='Doe, John', ids=[dict(source='orcid', id='1')])]),
+     False),
+    (dict(title='A record', contributors=[
+        dict(name='Doe, John', nickname='JD')]), False),
+    (dict(title=5, contributors=[CONTRIBUTOR]), False),
+    (dict(title='A record', keywords='cern', contributors=[CONTRIBUTOR]),
+     False),
+    (dict(title='A record', owner='me', contributors=[CONTRIBUTOR]), False),
+    (dict(title='A record', author={'$ref': 'x'}, contributors=[
+        CONTRIBUTOR]), False),
+]
+
+
+@pytest.fixture()
+def app():
+    """Application with the single-pass validation enabled."""
+    app = Flask('testapp')
+    app.config['MY_SITE_SINGLE_PASS_VALIDATION'] = True
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture(scope='module')
+def schema():
+    """The resolved record schema."""
+    with open(SCHEMA_PATH) as fp:
+        return json.load(fp)
+
+
+def load(payload):
+    """Load a payload like the REST loader, ``None`` if rejected."""
+    if marshmallow_version[0] < 3:
+        result = MetadataSchemaV1().load(payload)
+        return None if result.errors else result.data
+    try:
+        return MetadataSchemaV1().load(payload)
+    except ValidationError:
+        return None
+
+
+def accepts(schema, payload):
+    """Check if a payload is loaded and valid against a schema."""
+    data = load(payload)
+    if data is None:
+        return False
+    # the identifier set by the minter
+    data['id'] = '1'
+    validator = validator_for({})(schema)
+    return validator.is_valid(data)
+
+
+@pytest.mark.parametrize('payload,valid', PAYLOADS)
+def test_single_pass_validation(app, schema, payload, valid):
+    """Both validation paths accept and reject the same payloads."""
+    partial = partial_schema(schema, VALIDATED_FIELDS)
+    assert accepts(schema, payload) is valid
+    assert accepts(partial, payload) is valid
+
+
+@pytest.mark.parametrize('payload', [
+    dict(title='A record', contributors=[]),
+    dict(title='A record', contributors=[
+        dict(name='Doe, John', role='Author')]),
+    dict(title='A record', contributors=[
+        dict(name='Doe, John', affiliations=['CERN', 'CERN'])]),
+])
+def test_single_pass_disabled(app, payload):
+    """The loader only enforces the JSON Schema with single-pass."""
+    app.config['MY_SITE_SINGLE_PASS_VALIDATION'] = False
+    assert load(payload) is not None
+
+
+def test_partial_schema(schema):
+    """Only the values of the validated fields are not checked."""
+    partial = partial_schema(schema, VALIDATED_FIELDS)
+    assert partial['required'] == schema['required']
+    assert partial['additionalProperties'] is False
+    assert partial['properties']['contributors'] == {}
+    assert partial['properties']['id'] == schema['properties']['id']
+    assert schema['properties']['contributors']['minItems'] == 1